@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.antimagic_field import main
+from src.antimagic_field.utils import rate_limiter
+
+_VALUES = tuple(
+    f"message number {index} long enough to be moved out of the code"
+    for index in range(12)
+)
+
+
+def ai_naming_check() -> int:
+    """
+    The `ai_naming_check` function runs `antimagic_field` with the `ai` solver
+    against a local fake of an OpenAI compatible completion endpoint that
+    fails every `--fail_every`-th request with a 503, so that retries,
+    batching and the concurrency limit are exercised without a model or
+    network access. The rate limiter window is shortened to `--window`
+    seconds for the run and its admission times are checked separately.
+    :return: 1 if any check fails, 0 otherwise.
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--fail_every", type=int, default=3)
+    parser.add_argument("--batch", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--requests_per_window", type=int, default=2)
+    parser.add_argument("--window", type=float, default=1.0)
+    args = parser.parse_args()
+    rate_limiter._WINDOW = args.window
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    server = _FakeCompletionServer(args.fail_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    cwd = os.getcwd()
+    with TemporaryDirectory() as root:
+        Path(root, "messages.py").write_text(
+            "".join(f"print({json.dumps(value)})\n" for value in _VALUES)
+        )
+        try:
+            main(
+                (
+                    "--root",
+                    root,
+                    "--difficult_string_solver",
+                    "ai",
+                    "--offline_naming",
+                    "false",
+                    "--ai_model",
+                    "openai/fake",
+                    "--ai_api_base",
+                    f"http://127.0.0.1:{server.server_port}",
+                    "--ai_solving_batch",
+                    str(args.batch),
+                    "--ai_concurrency",
+                    str(args.concurrency),
+                    "--ai_requests_per_minute",
+                    str(args.requests_per_window),
+                    "messages.py",
+                )
+            )
+        finally:
+            os.chdir(cwd)
+            server.shutdown()
+        written = "".join(
+            path.read_text() for path in Path(root).rglob("*.py")
+        )
+    acquired = asyncio.run(
+        _acquire_times(args.requests_per_window, len(server.starts))
+    )
+    checks = {
+        "every value is named by the model": all(
+            _fake_name(value) in written for value in _VALUES
+        ),
+        "failed requests were retried": server.failed > 0,
+        "one request per batch and retry": (
+            len(server.starts)
+            == -(-len(_VALUES) // args.batch) + server.failed
+        ),
+        "concurrency stays within its limit": (
+            server.max_in_flight <= args.concurrency
+        ),
+        "request rate stays within its limit": all(
+            later - earlier >= args.window
+            for earlier, later in zip(
+                acquired, acquired[args.requests_per_window :]
+            )
+        ),
+    }
+    print(
+        f"{len(server.starts)} requests, {server.failed} failed, "
+        f"at most {server.max_in_flight} in flight"
+    )
+    for name, passed in checks.items():
+        print(f"{name}: {'ok' if passed else 'FAILED'}")
+    return int(not all(checks.values()))
+
+
+async def _acquire_times(requests_per_window: int, n: int) -> list[float]:
+    limiter = rate_limiter.RateLimiter(requests_per_window)
+    acquired = []
+    for _ in range(n):
+        await limiter.acquire(0)
+        acquired.append(time.monotonic())
+    return acquired
+
+
+def _fake_name(value: str) -> str:
+    return "NAME_" + hashlib.md5(value.encode()).hexdigest()[:8].upper()
+
+
+class _FakeCompletionServer(ThreadingHTTPServer):
+    def __init__(self, fail_every: int):
+        super().__init__(("127.0.0.1", 0), _FakeCompletionHandler)
+        self.fail_every = fail_every
+        self.lock = threading.Lock()
+        self.starts: list[float] = []
+        self.failed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+
+class _FakeCompletionHandler(BaseHTTPRequestHandler):
+    server: _FakeCompletionServer
+
+    def do_POST(self) -> None:
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server = self.server
+        with server.lock:
+            server.starts.append(time.monotonic())
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            fail = len(server.starts) % server.fail_every == 0
+        time.sleep(0.1)
+        with server.lock:
+            server.in_flight -= 1
+            server.failed += fail
+        if fail:
+            self._send(503, {"error": {"message": "overloaded"}})
+            return
+        fields = dict(
+            line.split(": ", 1)
+            for line in body["messages"][0]["content"].splitlines()[1:]
+        )
+        content = {
+            field: _fake_name(json.loads(value))
+            for field, value in fields.items()
+        }
+        self._send(
+            200,
+            {
+                "id": "fake",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "fake",
+                "choices": [
+                    {
+                        "index": 0,
+                        "finish_reason": "stop",
+                        "message": {
+                            "role": "assistant",
+                            "content": json.dumps(content),
+                        },
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "total_tokens": 0,
+                },
+            },
+        )
+
+    def _send(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+if __name__ == "__main__":
+    exit(ai_naming_check())
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+_MAIN = Path(__file__).parent / "main.py"
+
+
+def startup_benchmark() -> int:
+    """
+    The `startup_benchmark` function runs `antimagic_field --help` and a no-op
+    run (no files to check, in an empty directory) several times each in a
+    fresh interpreter and compares their median wall time with a budget in
+    milliseconds, so that an import added to the entry point that makes every
+    pre-commit invocation slower is caught.
+    :return: 1 if any median exceeds its budget, 0 otherwise.
+    """
+    parser = ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--help_budget_ms", type=float, default=1000)
+    parser.add_argument("--noop_budget_ms", type=float, default=2500)
+    args = parser.parse_args()
+    fail = 0
+    with TemporaryDirectory() as empty_directory:
+        for name, command, budget in (
+            ("--help", (str(_MAIN), "--help"), args.help_budget_ms),
+            ("no-op", (str(_MAIN),), args.noop_budget_ms),
+        ):
+            median = statistics.median(
+                _run_ms(command, empty_directory) for _ in range(args.runs)
+            )
+            over_budget = median > budget
+            fail |= over_budget
+            print(
+                f"{name}: {median:.0f} ms (budget {budget:.0f} ms)"
+                + (" OVER BUDGET" if over_budget else "")
+            )
+    return fail
+
+
+def _run_ms(command: tuple[str, ...], cwd: str) -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        (sys.executable, *command),
+        cwd=cwd,
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":
+    exit(startup_benchmark())
@@ -1,32 +1,39 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from importlib import import_module
 from pathlib import Path
+from typing import Any
 
-from .main import main
 from .str_consts.src.antimagic_field import EMPTY
 from .str_consts.src.antimagic_field import INIT_PY
 from .str_consts.src.antimagic_field import MAIN
 from .str_consts.src.antimagic_field import PY
 from .str_consts.src.antimagic_field import PYCACHE
 
-_ = main
 
-
-def import_python(root: Path):
+def python_modules(root: Path) -> Iterator[str]:
     for module_path in root.glob(PY):
         if module_path.name in (INIT_PY, PYCACHE, "__pycache__"):
             continue
         if module_path.is_file():
-            relative_path = module_path.relative_to(Path(__file__).parent)
-            subfolders = EMPTY.join(
-                map(".{}".format, relative_path.parts[:-1])
-            )
-            str_path = module_path.with_suffix(EMPTY).name
-            import_module("." + str_path, __name__ + subfolders)
             yield module_path.with_suffix(EMPTY).name
             continue
-        yield from import_python(module_path)
+        yield from python_modules(module_path)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports `main` and the modules in `__all__` on first access so that
+    entry points such as `antimagic_field.client` and `--help` do not pay
+    for the dependencies of every module.
+    """
+    if name == MAIN:
+        globals()[MAIN] = import_module("." + MAIN, __name__).main
+        return globals()[MAIN]
+    if name in __all__:
+        return import_module("." + name, __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-__all__ = [MAIN] + list(import_python(Path(__file__).parent))
+__all__ = [MAIN] + list(python_modules(Path(__file__).parent))
@@ -1,38 +1,50 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import sys
 from collections.abc import Collection
 from collections.abc import Iterable
+from collections.abc import Sequence
+from functools import lru_cache
 from itertools import chain
 from typing import Type
 
-from litellm import completion
-from more_itertools import batched
 from pydantic import BaseModel
 from pydantic import create_model
-from pydantic import Field
 
 from .config import Config
 from .constants.const import Const
 from .constants.const_base import ConstBase
 from .exceptions import FailedToSolveDuplicates
-from .solve_duplicates import solve_duplicates
+from .naming_cache import NamingCache
+from .solve_duplicates import DuplicateIndex
 from .str_consts.src.antimagic_field import EMPTY
+from .str_consts.src.antimagic_field import NEWLINE
 from .str_consts.src.antimagic_field.ai_solve import CONTENT
 from .str_consts.src.antimagic_field.ai_solve import FIELD_NAMES
 from .str_consts.src.antimagic_field.ai_solve import MESSAGE
 from .str_consts.src.antimagic_field.ai_solve import ROLE
 from .str_consts.src.antimagic_field.ai_solve import STRING_FORMATTED
 from .str_consts.src.antimagic_field.ai_solve import USER
+from .utils.rate_limiter import RateLimiter
+
+_CHARS_PER_TOKEN = 4
+_PROMPT = (
+    "Peak suitable constant names for the following strings. "
+    "Constant names must be uppercase ascii strings with "
+    "words connected by _ with no more than 5 words. "
+    "Constant name shouldn't start with digits and "
+    "mustn't contain special characters. You mustn't use the same name twice."
+)
 
 
 def ai_solve_duplicates(
-    all_consts: Collection[ConstBase], config: Config, const_names: set[str]
-):
+    duplicate_index: DuplicateIndex, config: Config, const_names: set[str]
+) -> None:
     n_duplicates = sys.maxsize
     while True:
-        duplicates = solve_duplicates(all_consts)
+        duplicates = duplicate_index.solve()
         if not duplicates:
             return
         duplicate_values = frozenset(chain.from_iterable(duplicates.values()))
@@ -41,13 +53,21 @@ def ai_solve_duplicates(
         n_duplicates = len(duplicates)
         duplicate_constants = tuple(
             sorted(
-                filter(
-                    lambda const: const.value in duplicate_values, all_consts
-                ),
+                duplicate_index.with_values(duplicate_values),
                 key=lambda const: const.const_name,
             )
         )
-        ai_assign_names(duplicate_constants, config, const_names, all_consts)
+        ai_assign_names(
+            tuple(
+                const
+                for const in duplicate_constants
+                if isinstance(const, Const)
+            ),
+            config,
+            const_names,
+            duplicate_constants,
+        )
+        duplicate_index.update(duplicate_constants)
 
 
 def ai_assign_names(
@@ -55,58 +75,233 @@ def ai_assign_names(
     config: Config,
     const_names: set[str],
     all_constants: Collection[ConstBase],
-):
-    tuple(
-        _ai_assign_names(solving_batch, config, const_names, all_constants)
-        for solving_batch in batched(unique_unnamed, config.ai_solving_batch)
+    named_constants: Iterable[ConstBase] = (),
+) -> int:
+    """
+    Names found in the naming cache are applied first unless they are taken
+    by a constant of `named_constants` with another value or are in
+    `const_names` without an owner there. The remaining constants are
+    requested from the model concurrently. Answers are applied
+    in batch order so the result does not depend on which request finished
+    first. Returns the number of requests sent.
+    """
+    naming_cache = NamingCache.from_config(config)
+    if naming_cache:
+        cached_names = naming_cache.names(
+            unique_unnamed, const_names, named_constants
+        )
+        _apply_names(cached_names, const_names, all_constants)
+        unique_unnamed = tuple(
+            filter(
+                lambda const: const.value not in cached_names, unique_unnamed
+            )
+        )
+    solving_batches = _pack_batches(unique_unnamed, config)
+    for solving_batch, solutions in zip(
+        solving_batches, asyncio.run(_request_names(solving_batches, config))
+    ):
+        value2name = _solutions2names(solving_batch, solutions)
+        _apply_names(value2name, const_names, all_constants)
+        if naming_cache:
+            for const in solving_batch:
+                if const.value in value2name:
+                    naming_cache.put(const, value2name[const.value])
+    if naming_cache:
+        naming_cache.save()
+    return len(solving_batches)
+
+
+def estimate_ai_requests(consts: Iterable[Const], config: Config) -> int:
+    return len(_pack_batches(consts, config))
+
+
+async def _request_names(
+    solving_batches: Sequence[Sequence[Const]], config: Config
+) -> list[dict[str, str]]:
+    semaphore = asyncio.Semaphore(config.ai_concurrency)
+    rate_limiter = RateLimiter(
+        config.ai_requests_per_minute, config.ai_tokens_per_minute
+    )
+
+    async def request(solving_batch: Sequence[Const]) -> dict[str, str]:
+        async with semaphore:
+            return await _request_batch_names(
+                solving_batch, config, rate_limiter
+            )
+
+    return await asyncio.gather(*map(request, solving_batches))
+
+
+async def _request_batch_names(
+    solving_batch: Sequence[Const], config: Config, rate_limiter: RateLimiter
+) -> dict[str, str]:
+    messages = [
+        {
+            ROLE: USER,
+            CONTENT: NEWLINE.join(
+                (
+                    _PROMPT,
+                    *(
+                        _field_line(index, const.value, config)
+                        for index, const in enumerate(solving_batch, 1)
+                    ),
+                )
+            ),
+        }
+    ]
+    response_format = _create_response_format(len(solving_batch))
+    estimated_tokens = _estimate_tokens(json.dumps(messages)) + _schema_tokens(
+        len(solving_batch)
+    )
+    for attempt in range(config.ai_retries):
+        try:
+            return await _complete(
+                messages,
+                response_format,
+                estimated_tokens,
+                config,
+                rate_limiter,
+            )
+        except _transient_errors():
+            await asyncio.sleep(2**attempt)
+    return await _complete(
+        messages, response_format, estimated_tokens, config, rate_limiter
     )
 
 
-def _ai_assign_names(
-    solving_batch: Collection[Const],
+async def _complete(
+    messages: list[dict[str, str]],
+    response_format: Type[BaseModel],
+    estimated_tokens: int,
     config: Config,
-    const_names: set[str],
-    all_constants: Iterable[ConstBase],
-):
-    solved_values = tuple(const.value for const in solving_batch)
-    solutions = json.loads(
-        completion(
+    rate_limiter: RateLimiter,
+) -> dict[str, str]:
+    from litellm import acompletion
+
+    await rate_limiter.acquire(estimated_tokens)
+    response = await asyncio.wait_for(
+        acompletion(
             config.ai_model,
-            messages=[
-                {
-                    ROLE: USER,
-                    CONTENT: (
-                        "Peak suitable constant names for the following string. "
-                        "Constant names must be uppercase ascii strings with "
-                        "words connected by _ with no more than 5 words. "
-                        "Constant name shouldn't start with digits and "
-                        "mustn't contain special characters. You mustn't use the same name twice."
-                    ),
-                }
-            ],
+            messages=messages,
             temperature=0.0,
-            response_format=_create_response_format(solving_batch),
-        ).choices[0][MESSAGE][CONTENT]
+            response_format=response_format,
+            api_base=config.ai_api_base,
+        ),
+        config.ai_timeout,
     )
-    for const in filter(Const.__instancecheck__, all_constants):
-        if const.value in solved_values and (
-            solution := solutions.get(
-                STRING_FORMATTED.format(solved_values.index(const.value) + 1)
-            )
+    if not (content := response.choices[0][MESSAGE][CONTENT]):
+        return {}
+    return json.loads(content)
+
+
+@lru_cache(maxsize=1)
+def _transient_errors() -> tuple[Type[Exception], ...]:
+    """
+    `litellm` is imported only once a request is made since importing it
+    takes longer than most runs that do not need the model.
+    """
+    from litellm.exceptions import APIConnectionError
+    from litellm.exceptions import InternalServerError
+    from litellm.exceptions import RateLimitError
+    from litellm.exceptions import ServiceUnavailableError
+    from litellm.exceptions import Timeout
+
+    return (
+        asyncio.TimeoutError,
+        APIConnectionError,
+        InternalServerError,
+        RateLimitError,
+        ServiceUnavailableError,
+        Timeout,
+    )
+
+
+def _solutions2names(
+    solving_batch: Iterable[Const], solutions: dict[str, str]
+) -> dict[str, str]:
+    value2name = {}
+    for index, const in enumerate(solving_batch, 1):
+        if const.value in value2name:
+            continue
+        value2name[const.value] = solutions.get(STRING_FORMATTED.format(index))
+    return {value: name for value, name in value2name.items() if name}
+
+
+def _apply_names(
+    value2name: dict[str, str],
+    const_names: set[str],
+    all_constants: Iterable[ConstBase],
+) -> None:
+    if not value2name:
+        return
+    for const in all_constants:
+        if isinstance(const, Const) and (
+            solution := value2name.get(const.value)
         ):
             const.set_const_name(solution, EMPTY, None)
-            const_names.add(const.const_name)
+            if const_name := const.const_name:
+                const_names.add(const_name)
 
 
-def _create_response_format(consts: Collection[Const]) -> Type[BaseModel]:
+def _pack_batches(
+    consts: Iterable[Const], config: Config
+) -> Sequence[Sequence[Const]]:
+    """
+    Greedily packs constants in order into batches whose estimated prompt
+    and schema size stays within `config.ai_batch_tokens`, with at most
+    `config.ai_solving_batch` constants each. A constant too large for the
+    budget on its own still gets a batch.
+    """
+    budget = (
+        config.ai_batch_tokens - _estimate_tokens(_PROMPT) - _schema_tokens(0)
+    )
+    field_schema_tokens = _schema_tokens(1) - _schema_tokens(0)
+    batches: list[list[Const]] = []
+    used = budget
+    for const in consts:
+        tokens = (
+            _estimate_tokens(
+                _field_line(config.ai_solving_batch, const.value, config)
+            )
+            + field_schema_tokens
+        )
+        if (
+            not batches
+            or len(batches[-1]) >= config.ai_solving_batch
+            or used + tokens > budget
+        ):
+            batches.append([])
+            used = 0
+        batches[-1].append(const)
+        used += tokens
+    return batches
+
+
+def _field_line(index: int, value: str, config: Config) -> str:
+    if len(value) > config.ai_value_chars:
+        head = config.ai_value_chars // 2
+        value = f"{value[:head]} ... {value[len(value) - head:]}"
+    return f"{STRING_FORMATTED.format(index)}: {json.dumps(value)}"
+
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // _CHARS_PER_TOKEN + 1
+
+
+@lru_cache
+def _schema_tokens(n_fields: int) -> int:
+    return _estimate_tokens(
+        json.dumps(_create_response_format(n_fields).model_json_schema())
+    )
+
+
+@lru_cache
+def _create_response_format(n_fields: int) -> Type[BaseModel]:
     return create_model(
         FIELD_NAMES,
-        __doc__="Descriptions contain values of constants that the names should be assigned to",
+        __doc__="Constant names for the strings listed under the same field names",
         **{
-            STRING_FORMATTED.format(index): (
-                str,
-                Field(description=const.value),
-            )
-            for index, const in enumerate(consts, 1)
+            STRING_FORMATTED.format(index): (str, ...)
+            for index in range(1, n_fields + 1)
         },
     )
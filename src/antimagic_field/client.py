@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from importlib import import_module
+
+from .str_consts.src.antimagic_field.config import SOCKET
+
+
+def main() -> int:
+    """
+    Thin replacement for `antimagic_field` that forwards its arguments to a
+    running `antimagic_field.daemon` and replays its output and exit code.
+    Only the standard library is imported unless no daemon is listening on
+    `--daemon_socket`, in which case the run happens in this process.
+    :return: The exit code `main` returned for the same arguments.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.connect(_socket_path(sys.argv[1:]))
+            connection.sendall(
+                json.dumps({"argv": sys.argv, "cwd": os.getcwd()}).encode()
+                + b"\n"
+            )
+            response = json.loads(connection.makefile("rb").readline())
+    except (FileNotFoundError, ConnectionRefusedError):
+        return import_module(".main", __package__).main()
+    sys.stdout.write(response["output"])
+    return response["exit_code"]
+
+
+def _socket_path(argv: list[str]) -> str:
+    socket_path: str = SOCKET
+    for position, argument in enumerate(argv):
+        if argument == "--daemon_socket" and position + 1 < len(argv):
+            socket_path = argv[position + 1]
+        elif argument.startswith("--daemon_socket="):
+            socket_path = argument.partition("=")[2]
+    return socket_path
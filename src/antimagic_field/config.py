@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import os
 from argparse import Namespace
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Any
 from typing import get_origin
@@ -12,10 +13,12 @@ from typing import Type
 import toml  # type: ignore
 from dotenv import load_dotenv
 from pydantic import BaseModel
+from pydantic import ConfigDict
 from pydantic import Field
 from pydantic_core import PydanticUndefined
 
 from .custom_argument_parser import CustomArgumentParser
+from .path_index import PathIndex
 from .str_consts.src.antimagic_field import DIRECTORY
 from .str_consts.src.antimagic_field import EMPTY
 from .str_consts.src.antimagic_field import MOST_COMMON
@@ -26,13 +29,18 @@ from .str_consts.src.antimagic_field.config import DEFAULT_FORMATTED
 from .str_consts.src.antimagic_field.config import ENV
 from .str_consts.src.antimagic_field.config import FORMATTED
 from .str_consts.src.antimagic_field.config import GENERATED_CONSTANTS
+from .str_consts.src.antimagic_field.config import JOURNAL
 from .str_consts.src.antimagic_field.config import POS_ARGS
+from .str_consts.src.antimagic_field.config import SOCKET
 
 load_dotenv()
 
 
 class Config(BaseModel):
+    model_config = ConfigDict(defer_build=True)
     _root: Path = Path(__file__).parent
+    _path_index: Optional[PathIndex] = None
+    _journal_run: Optional[str] = None
     pos_args: list[str] = Field(default_factory=list)
     config_file: Optional[Path] = None
     consts_location: Literal["directory", "file", "local"] = DIRECTORY
@@ -45,13 +53,39 @@ class Config(BaseModel):
     duplicates_solver: Literal["exception", "ignore", "most_common"] = (
         MOST_COMMON
     )
-    difficult_string_solver: Literal["exception", "ignore", "ai"] = "ai"
+    difficult_string_solver: Literal[
+        "exception", "ignore", "ai", "offline"
+    ] = "ai"
+    offline_naming: bool = True
     ai_model: str = "anthropic/claude-3-5-sonnet-20240620"
     allowed_consts: str = r"(?=.*\s)[\s\S]{50,}"
     ai_solving_batch: int = 30
+    ai_batch_tokens: int = 4000
+    ai_value_chars: int = 400
     max_duplicates_solve_attempts: int = 3
+    ai_concurrency: int = 4
+    ai_requests_per_minute: Optional[int] = None
+    ai_tokens_per_minute: Optional[int] = None
+    ai_timeout: float = 120.0
+    ai_retries: int = 3
+    ai_api_base: Optional[str] = None
+    naming_cache_size: int = 100_000
     formatting: Optional[str] = None
+    formatting_function: Optional[str] = None
     suppress_fail: bool = False
+    jobs: int = 1
+    cache_dir: Optional[Path] = None
+    scan_cache_size: int = 100_000
+    prefilter: bool = False
+    gitignore: bool = True
+    detection_backend: Literal["libcst", "ast"] = "libcst"
+    low_memory: bool = False
+    rewrite_engine: Literal["splice", "cst", "verify"] = "splice"
+    changed_since: Optional[str] = None
+    staged: bool = False
+    daemon_socket: str = SOCKET
+    daemon_poll_interval: float = 1.0
+    journal_dir: str = JOURNAL
     env_file_path: Path = Path(ENV)
 
     def __init__(self, /, **data: Any):
@@ -68,16 +102,19 @@ class Config(BaseModel):
             return self.env_file_path
         return self.root / self.env_file_path
 
+    @property
+    def path_index(self) -> PathIndex:
+        if self._path_index is None:
+            self._path_index = PathIndex(self)
+        return self._path_index
+
     def is_excluded(self, path: Path) -> bool:
-        return bool(self.exclude) and any(
-            map(
-                path.absolute().is_relative_to,
-                map(Path.absolute, map(Path, self.exclude.split(","))),
-            )
-        )
+        return self.path_index.is_excluded(path)
 
 
-def parse_arguments(config_class: Type[Config]) -> Namespace:
+def parse_arguments(
+    config_class: Type[Config], argv: Optional[Sequence[str]] = None
+) -> Namespace:
     parser = CustomArgumentParser(
         description="Configure the application settings."
     )
@@ -97,7 +134,7 @@ def parse_arguments(config_class: Type[Config]) -> Namespace:
             help=DEFAULT_FORMATTED.format(value),
         )
 
-    return parser.parse_args()
+    return parser.parse_args(argv)
 
 
 def create_config_with_args(
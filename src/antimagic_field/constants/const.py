@@ -1,7 +1,8 @@
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass
-from functools import lru_cache
+from dataclasses import field
 from pathlib import Path
 from typing import Optional
 
@@ -9,6 +10,7 @@ import libcst
 
 from ..config import Config
 from ..constants.const_base import ConstBase
+from ..constants.string_record import StringRecord
 from ..str_consts.src.antimagic_field import COMA_SPACE
 from ..str_consts.src.antimagic_field import DIRECTORY
 from ..str_consts.src.antimagic_field import DOUBLE_QUOTES
@@ -25,32 +27,66 @@ from ..utils.formated_string2string import formated_string2string
 
 @dataclass(slots=True)
 class Const(ConstBase):
-    string_node: libcst.SimpleString | libcst.FormattedString
+    string_node: libcst.SimpleString | libcst.FormattedString | StringRecord
     origin_filepath: Path
     _import_filepath: Optional[Path] = None
     _const_name: Optional[str] = None
+    _span: Optional[tuple[int, int]] = None
+    _value: Optional[str] = field(default=None, repr=False, compare=False)
 
     def get_import_filepath(self, config: Config) -> Path:
         if config.consts_location == DIRECTORY:
             if self._import_filepath:
-                return self._import_filepath.absolute()
-            return origin2import(self.origin_filepath, config).absolute()
+                return self._import_filepath
+            return config.path_index.import_filepath(self.origin_filepath)
         raise ValueError("var_location can only be folder for now")
 
     def set_import_path(self, path: Path):
         self._import_filepath = path.absolute()
 
-    def is_path_relative(self, parent_path: Path) -> bool:
-        return self.origin_filepath.absolute().is_relative_to(
-            parent_path.absolute()
+    def attach_node(
+        self, string_node: libcst.SimpleString | libcst.FormattedString
+    ) -> None:
+        self._span = self.span
+        self.string_node = string_node
+
+    def record(self) -> StringRecord:
+        if (span := self.span) is None:
+            raise ValueError(f"{self.value!r} was scanned without its span")
+        return StringRecord(
+            self.value, self.is_formatted, self.is_rstring, span
         )
 
+    @property
+    def span(self) -> Optional[tuple[int, int]]:
+        if isinstance(self.string_node, StringRecord):
+            return self.string_node.span
+        return self._span
+
     @property
     def is_rstring(self) -> bool:
+        if isinstance(self.string_node, StringRecord):
+            return self.string_node.is_rstring
         return self.string_node.prefix == R
 
+    @property
+    def is_formatted(self) -> bool:
+        if isinstance(self.string_node, StringRecord):
+            return self.string_node.is_formatted
+        return isinstance(self.string_node, libcst.FormattedString)
+
     @property
     def value(self) -> str:
+        if self._value is None:
+            value = self._evaluate()
+            self._value = (
+                sys.intern(value) if isinstance(value, str) else value
+            )
+        return self._value
+
+    def _evaluate(self) -> str:
+        if isinstance(self.string_node, StringRecord):
+            return self.string_node.value
         if isinstance(self.string_node, libcst.SimpleString):
             return self.string_node.evaluated_value
         if isinstance(self.string_node, libcst.FormattedString):
@@ -62,7 +98,7 @@ class Const(ConstBase):
         if self._const_name is not None:
             return self._const_name
         string = self.value
-        if isinstance(self.string_node, libcst.FormattedString):
+        if self.is_formatted:
             string += "_formatted"
         if string in _known_strings:
             return _known_strings[string]
@@ -82,17 +118,6 @@ class Const(ConstBase):
                 self._const_name += suffix
 
 
-def origin2import(origin_filepath: Path, config: Config) -> Path:
-    return _origin2import(origin_filepath, config.consts_location_name)
-
-
-@lru_cache
-def _origin2import(origin_filepath: Path, consts_location_name: str) -> Path:
-    return Path(consts_location_name) / origin_filepath.absolute().relative_to(
-        Path().absolute()
-    )
-
-
 _known_strings = {
     NEWLINE: "NEWLINE",
     STAR: "STAR",
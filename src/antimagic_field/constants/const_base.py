@@ -4,11 +4,11 @@ import re
 import string
 from abc import ABC
 from abc import abstractmethod
+from functools import lru_cache
 from itertools import filterfalse
 from pathlib import Path
 from typing import Optional
-
-import inflect
+from typing import TYPE_CHECKING
 
 from ..config import Config
 from ..str_consts.src.antimagic_field import EMPTY
@@ -17,6 +17,9 @@ from ..str_consts.src.antimagic_field import UNDERSCORE
 from ..str_consts.src.antimagic_field.constants.const_base import A_ZA_Z
 from ..str_consts.src.antimagic_field.constants.const_base import S
 
+if TYPE_CHECKING:
+    import inflect
+
 
 class ConstBase(ABC):
     const_name: str
@@ -27,10 +30,6 @@ class ConstBase(ABC):
     def set_const_name(self, const_name: Optional[str], suffix: str):
         pass
 
-    @abstractmethod
-    def is_path_relative(self, parent_path: Path) -> bool:
-        pass
-
     @abstractmethod
     def set_import_path(self, path: Path):
         pass
@@ -40,6 +39,7 @@ class ConstBase(ABC):
         pass
 
     @staticmethod
+    @lru_cache(maxsize=1 << 16)
     def _format_const_name(
         const_name: str, max_n_parts: Optional[int] = 3
     ) -> Optional[str]:
@@ -66,7 +66,9 @@ class ConstBase(ABC):
             const_name = re.sub(
                 r"[\d,.]+_?",
                 (
-                    p.number_to_words(num, comma=EMPTY, andword=EMPTY)
+                    _inflect_engine().number_to_words(
+                        num, comma=EMPTY, andword=EMPTY
+                    )
                     + UNDERSCORE
                 )
                 .replace(",", EMPTY)
@@ -87,4 +89,14 @@ class ConstBase(ABC):
 
 
 allowed_chars = (*string.digits, *string.ascii_letters, UNDERSCORE)
-p = inflect.engine()
+
+
+@lru_cache(maxsize=1)
+def _inflect_engine() -> inflect.engine:
+    """
+    `inflect` takes seconds to import and is only needed for names starting
+    with a number so it is imported the first time such a name is formatted.
+    """
+    import inflect
+
+    return inflect.engine()
@@ -28,9 +28,6 @@ class PreviousConst(ConstBase):
         self.previous_written_filepath = self.written_filepath
         self.written_filepath = path
 
-    def is_path_relative(self, parent_path: Path) -> bool:
-        return self.written_filepath.is_relative_to(parent_path)
-
     def get_import_filepath(self, _: Config) -> Path:
         return self.written_filepath.absolute()
 
@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, slots=True)
+class StringRecord:
+    value: str
+    is_formatted: bool
+    is_rstring: bool
+    span: tuple[int, int]
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+from collections.abc import Iterable
+from hashlib import sha1
+from pathlib import Path
+from typing import Any
+
+from .config import Config
+from .constants.previous_const import PreviousConst
+from .read_consts import parse_consts
+from .str_consts.src.antimagic_field.consts_manifest import MANIFEST
+
+_MANIFEST_VERSION = 1
+
+
+class ConstsManifest:
+    """
+    Sidecar file next to the generated constants listing the name, value and
+    raw flag of every constant (aliases included) of each constants file
+    together with the hash of that file. Files whose hash still matches are
+    loaded from the manifest and only the others are parsed again.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.path = Path(config.consts_location_name).joinpath(MANIFEST)
+        self._files: dict[str, Any] = self._load()
+        self._dirty = False
+
+    def read(self, consts_file_paths: Iterable[Path]) -> list[PreviousConst]:
+        """
+        Reads the given constants files and forgets every other file so that
+        deleted files do not linger in the manifest.
+        """
+        files, self._files = self._files, {}
+        consts = []
+        for consts_file_path in consts_file_paths:
+            if (entry := files.get(self._key(consts_file_path))) is not None:
+                self._files[self._key(consts_file_path)] = entry
+            consts.extend(self._read(consts_file_path))
+        self._dirty |= files.keys() != self._files.keys()
+        self.save()
+        return consts
+
+    def refresh(self, consts_file_paths: Iterable[Path]) -> None:
+        for consts_file_path in consts_file_paths:
+            self._read(consts_file_path)
+        self.save()
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(
+            json.dumps(
+                {
+                    "version": _MANIFEST_VERSION,
+                    "suffix": self.config.const_name_suffix,
+                    "files": self._files,
+                }
+            )
+        )
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _read(self, consts_file_path: Path) -> list[PreviousConst]:
+        key = self._key(consts_file_path)
+        if not consts_file_path.exists():
+            self._dirty |= self._files.pop(key, None) is not None
+            return []
+        content = consts_file_path.read_bytes()
+        digest = sha1(content).hexdigest()
+        if (entry := self._files.get(key)) and entry["hash"] == digest:
+            return [
+                PreviousConst(name, value, consts_file_path, is_rstring=raw)
+                for name, value, raw in entry["consts"]
+            ]
+        consts = parse_consts(
+            io.TextIOWrapper(io.BytesIO(content)).read(),
+            consts_file_path,
+            self.config,
+        )
+        if all(isinstance(const.value, str) for const in consts):
+            self._files[key] = {
+                "hash": digest,
+                "consts": [
+                    (const.const_name, const.value, const.is_rstring)
+                    for const in consts
+                ],
+            }
+        else:
+            self._files.pop(key, None)
+        self._dirty = True
+        return consts
+
+    def _key(self, consts_file_path: Path) -> str:
+        return os.path.relpath(consts_file_path, self.path.parent)
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            manifest = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        if (
+            not isinstance(manifest, dict)
+            or manifest.get("version") != _MANIFEST_VERSION
+            or manifest.get("suffix") != self.config.const_name_suffix
+        ):
+            return {}
+        return manifest["files"]
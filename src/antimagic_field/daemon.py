@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import json
+import os
+import signal
+import socket
+import sys
+import traceback
+from contextlib import redirect_stderr
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from typing import Any
+
+from .config import Config
+from .config import create_config_with_args
+from .config import parse_arguments
+from .main import main as run
+from .warm_index import WarmIndex
+
+
+def main() -> int:
+    """
+    Serves check and fix requests sent by `antimagic_field.client` over a Unix
+    socket, keeping parsed sources and generated constants warm in a
+    `WarmIndex` between requests. The index is refreshed whenever no request
+    arrives for `daemon_poll_interval` seconds.
+    :return: 0 once the daemon is interrupted.
+    """
+    config = create_config_with_args(Config, parse_arguments(Config))
+    os.chdir(config.root)
+    socket_path = Path(config.daemon_socket).absolute()
+    socket_path.unlink(missing_ok=True)
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    index = WarmIndex()
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(socket_path))
+        server.listen()
+        server.settimeout(config.daemon_poll_interval)
+        print(f"Listening on {socket_path}")
+        try:
+            while True:
+                try:
+                    connection, _ = server.accept()
+                except TimeoutError:
+                    index.refresh()
+                    continue
+                with connection:
+                    connection.settimeout(None)
+                    request = json.loads(connection.makefile("rb").readline())
+                    connection.sendall(
+                        json.dumps(_handle(request, index)).encode() + b"\n"
+                    )
+        except KeyboardInterrupt:
+            return 0
+        finally:
+            socket_path.unlink(missing_ok=True)
+
+
+def _handle(request: dict[str, Any], index: WarmIndex) -> dict[str, Any]:
+    argv = sys.argv
+    output = StringIO()
+    try:
+        os.chdir(request["cwd"])
+        sys.argv = request["argv"]
+        with redirect_stdout(output), redirect_stderr(output):
+            try:
+                exit_code = int(
+                    run(["--root", request["cwd"], *sys.argv[1:]], index)
+                )
+            except SystemExit as e:
+                exit_code = (
+                    e.code
+                    if isinstance(e.code, int)
+                    else int(e.code is not None)
+                )
+            except Exception:
+                traceback.print_exc()
+                exit_code = 1
+    finally:
+        sys.argv = argv
+    return {"exit_code": exit_code, "output": output.getvalue()}
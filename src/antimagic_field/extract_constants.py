@@ -1,20 +1,55 @@
 from __future__ import annotations
 
+from collections.abc import Collection
 from collections.abc import Sequence
 from functools import partial
 from pathlib import Path
+from typing import Optional
+from typing import Union
 
+from libcst import FormattedString
 from libcst import Module
+from libcst import parse_module
+from libcst import SimpleString
 
 from .config import Config
 from .constants.const import Const
+from .str_consts.src.antimagic_field.extract_constants import AST
+from .transform.ast_magic_seeker import AstMagicSeeker
 from .transform.magic_seeker import MagicSeeker
+from .utils.get_spans import get_spans
 
 
 def extract_constants(
-    filepath: Path, module: Module, config: Config
-) -> Sequence[Const]:
+    filepath: Path, source: str, config: Config, with_spans: bool = False
+) -> tuple[Optional[Module], Sequence[Const]]:
+    if config.detection_backend == AST:
+        return None, tuple(
+            map(
+                partial(Const, origin_filepath=filepath),
+                AstMagicSeeker.get_magical_strings(source, config),
+            )
+        )
+    module = parse_module(source)
     magical_strings = MagicSeeker.get_magical_strings(module, config)
-    return tuple(
-        map(partial(Const, origin_filepath=filepath), magical_strings)
+    if not with_spans:
+        return module, tuple(
+            map(partial(Const, origin_filepath=filepath), magical_strings)
+        )
+    return module, tuple(
+        Const(string_node, filepath, _span=span)
+        for string_node, span in zip(
+            magical_strings, get_spans(module, magical_strings, source)
+        )
     )
+
+
+def attach_string_nodes(
+    module: Module, source: str, consts: Collection[Const], config: Config
+) -> None:
+    magical_strings = MagicSeeker.get_magical_strings(module, config)
+    span2node: dict[
+        Optional[tuple[int, int]], Union[SimpleString, FormattedString]
+    ] = dict(zip(get_spans(module, magical_strings, source), magical_strings))
+    for const in consts:
+        const.attach_node(span2node[const.span])
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import os
+import shlex
+import subprocess
+from collections.abc import Collection
+from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from importlib import import_module
+from math import ceil
+from pathlib import Path
+
+from .config import Config
+from .str_consts.src.antimagic_field import SPACE
+
+_MAX_COMMAND_BYTES = 100_000
+_COMMAND_MARGIN = 4096
+
+
+def format_files(filepaths: Collection[Path], config: Config) -> None:
+    """
+    Runs the configured formatter once over the files written by this run.
+    `config.formatting_function` ("module:function") is called in process
+    with all paths, otherwise the `config.formatting` command is run in
+    batches small enough for the argument limits, `config.jobs` at a time,
+    and their output is printed in batch order.
+    """
+    if not filepaths:
+        return
+    paths = sorted(map(str, filepaths))
+    if config.formatting_function is not None:
+        module_name, _, function_name = config.formatting_function.partition(
+            ":"
+        )
+        getattr(import_module(module_name), function_name)(paths)
+        return
+    if config.formatting is None:
+        return
+    formatting = config.formatting
+    jobs = config.jobs or os.cpu_count() or 1
+    commands = tuple(
+        formatting.format(
+            filepaths=SPACE.join(map(shlex.quote, batch))
+        ).replace(r"\n", "\n")
+        for batch in _batches(paths, formatting, jobs)
+    )
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        for completed in executor.map(
+            lambda command: subprocess.run(
+                command,
+                shell=True,
+                capture_output=True,
+                text=True,
+            ),
+            commands,
+        ):
+            print(completed.stdout + completed.stderr, end="")
+
+
+def _batches(
+    filepaths: Sequence[str], formatting: str, jobs: int
+) -> list[list[str]]:
+    max_batch_size = ceil(len(filepaths) / jobs)
+    max_length = _max_command_bytes(formatting)
+    batches: list[list[str]] = [[]]
+    length = 0
+    for filepath in filepaths:
+        quoted_length = len(os.fsencode(shlex.quote(filepath))) + 1
+        if batches[-1] and (
+            len(batches[-1]) >= max_batch_size
+            or length + quoted_length > max_length
+        ):
+            batches.append([])
+            length = 0
+        batches[-1].append(filepath)
+        length += quoted_length
+    return batches
+
+
+def _max_command_bytes(formatting: str) -> int:
+    """
+    Bytes left for the quoted paths of one command. The command is a single
+    argument of `sh -c`, which Linux limits to 128 KiB, so it stays below
+    `_MAX_COMMAND_BYTES`, and it shares `ARG_MAX` with the environment the
+    shell inherits. `_COMMAND_MARGIN` covers the shell arguments and pointers.
+    The paths are repeated for every `{filepaths}` of the template (such as
+    `black {filepaths}\nisort {filepaths}`), which divides the budget.
+    """
+    environment_bytes = sum(
+        len(os.fsencode(key)) + len(os.fsencode(value)) + 2
+        for key, value in os.environ.items()
+    )
+    try:
+        arg_max = os.sysconf("SC_ARG_MAX")
+    except (AttributeError, ValueError, OSError):
+        arg_max = _MAX_COMMAND_BYTES + environment_bytes
+    return (
+        min(_MAX_COMMAND_BYTES, arg_max - environment_bytes)
+        - _COMMAND_MARGIN
+        - len(os.fsencode(formatting))
+    ) // max(formatting.count("{filepaths}"), 1)
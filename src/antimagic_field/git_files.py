@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import os
+import subprocess
+from collections.abc import Collection
+from collections.abc import Sequence
+from pathlib import Path
+
+from .config import Config
+
+
+def git_files(config: Config) -> Sequence[str]:
+    if config.staged:
+        changed: Sequence[str] = _git(
+            "diff", "--cached", "--name-only", "--diff-filter=d", "--relative"
+        )
+    elif config.changed_since is not None:
+        changed = (
+            *_git(
+                "diff",
+                "--name-only",
+                "--diff-filter=d",
+                "--relative",
+                config.changed_since,
+            ),
+            *_git("ls-files", "--others", "--exclude-standard"),
+        )
+    else:
+        raise ValueError("git_files needs --staged or --changed_since")
+    if not config.pos_args:
+        return changed
+    selected = frozenset(
+        map(config.path_index.absolute_parts, map(Path, config.pos_args))
+    )
+    return tuple(
+        path for path in changed if _is_selected(path, selected, config)
+    )
+
+
+def _is_selected(
+    path: str, selected: frozenset[tuple[str, ...]], config: Config
+) -> bool:
+    """
+    Whether `path` or one of its parents is among the `selected` paths.
+    """
+    parts = config.path_index.absolute_parts(Path(path))
+    return any(parts[:depth] in selected for depth in range(len(parts) + 1))
+
+
+def read_staged(filepaths: Collection[Path]) -> dict[Path, bytes]:
+    if not filepaths:
+        return {}
+    output = subprocess.run(
+        ("git", "cat-file", "--batch"),
+        input=b"".join(f":./{filepath}\n".encode() for filepath in filepaths),
+        capture_output=True,
+        check=True,
+    ).stdout
+    contents = {}
+    position = 0
+    for filepath in filepaths:
+        header_end = output.index(b"\n", position)
+        header = output[position:header_end].split()
+        position = header_end + 1
+        if header[-1] == b"missing":
+            continue
+        size = int(header[2])
+        contents[filepath] = output[position : position + size]
+        position += size + 1
+    return contents
+
+
+def _git(*args: str) -> tuple[str, ...]:
+    return tuple(
+        map(
+            os.fsdecode,
+            filter(
+                None,
+                subprocess.run(
+                    ("git", *args, "-z"),
+                    capture_output=True,
+                    check=True,
+                ).stdout.split(b"\0"),
+            ),
+        )
+    )
@@ -8,8 +8,8 @@ from more_itertools import map_reduce
 
 from .config import Config
 from .constants.const import Const
-from .constants.const import origin2import
 from .constants.const_base import ConstBase
+from .constants.previous_const import PreviousConst
 from .str_consts.src.antimagic_field import INIT_PY
 
 
@@ -22,19 +22,63 @@ def group2files(
         new_const = next(filter(Const.__instancecheck__, constants), None)
         if new_const is None:
             continue
-        filepath: Path = new_const.origin_filepath
-        while not all(
-            const.is_path_relative(filepath)
-            or const.is_path_relative(origin2import(filepath, config))
-            for const in constants
-        ):
-            filepath = filepath.parent
+        filepath = _common_parent(new_const.origin_filepath, constants, config)
         if filepath.is_dir():
             filepath = filepath.joinpath(INIT_PY)
         tuple(
-            const.set_import_path(origin2import(filepath, config))
+            const.set_import_path(config.path_index.import_filepath(filepath))
             for const in constants
         )
     return map_reduce(
         all_consts, lambda const: const.get_import_filepath(config)
     )
+
+
+def _common_parent(
+    filepath: Path,
+    constants: Collection[ConstBase],
+    config: Config,
+) -> Path:
+    """
+    Deepest of `filepath` and its parents that every constant is relative to,
+    either directly or through its mirror in the constants directory. Each
+    constant is compared once on path components, giving the number of
+    leading components of `filepath` it shares, and the minimum is taken.
+    """
+    absolute_parts = config.path_index.absolute_parts
+    parts = filepath.parts
+    absolute = absolute_parts(filepath)
+    cwd = config.path_index.root.parts
+    offset = len(absolute) - len(parts)
+    consts_parts = Path(config.consts_location_name).parts
+    mirrored = absolute[len(cwd) :] if absolute[: len(cwd)] == cwd else None
+    depth = len(parts)
+    for const in constants:
+        if isinstance(const, Const):
+            const_parts = absolute_parts(const.origin_filepath)
+            direct = _shared(const_parts, absolute) - offset
+            root = cwd + consts_parts
+        elif isinstance(const, PreviousConst):
+            const_parts = const.written_filepath.parts
+            direct = _shared(const_parts, parts)
+            root = consts_parts
+        else:
+            raise ValueError(f"Unknown constant type {type(const)}")
+        if mirrored is not None and const_parts[: len(root)] == root:
+            direct = max(
+                direct,
+                _shared(const_parts[len(root) :], mirrored)
+                + len(cwd)
+                - offset,
+            )
+        depth = min(depth, direct)
+    return Path(*parts[: max(depth, bool(filepath.anchor))])
+
+
+def _shared(parts: tuple[str, ...], other: tuple[str, ...]) -> int:
+    shared = 0
+    for part, other_part in zip(parts, other):
+        if part != other_part:
+            break
+        shared += 1
+    return shared
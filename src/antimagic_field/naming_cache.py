@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from typing import Optional
+
+from more_itertools import map_reduce
+
+from .config import Config
+from .constants.const import Const
+from .constants.const_base import ConstBase
+from .utils.json_lru_cache import JsonLruCache
+
+PROMPT_VERSION = 2
+
+
+class NamingCache:
+    """
+    Names accepted from the model keyed by the value of a constant, whether
+    it is formatted, the model and `PROMPT_VERSION` so that a string is only
+    ever sent to the model once per model and prompt.
+    """
+
+    def __init__(self, cache: JsonLruCache, config: Config) -> None:
+        self._cache = cache
+        self._model = config.ai_model
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional[NamingCache]:
+        if config.cache_dir is None:
+            return None
+        return cls(
+            JsonLruCache(
+                config.cache_dir / "naming_cache.json",
+                config.naming_cache_size,
+            ),
+            config,
+        )
+
+    def names(
+        self,
+        consts: Iterable[Const],
+        const_names: set[str],
+        named_constants: Iterable[ConstBase],
+    ) -> dict[str, str]:
+        """
+        Cached names of `consts` by value skipping names that are already
+        used for another value or that another cached name took.
+        """
+        name2values = map_reduce(
+            filter(lambda const: const.const_name, named_constants),
+            lambda const: const.const_name,
+            lambda const: const.value,
+            set,
+        )
+        value2name: dict[str, str] = {}
+        cached_names = set()
+        for const in consts:
+            if (name := self._cache.get(self._key(const))) is None:
+                continue
+            if name in cached_names or (
+                name in const_names and name2values.get(name) != {const.value}
+            ):
+                continue
+            value2name[const.value] = name
+            cached_names.add(name)
+        return value2name
+
+    def put(self, const: Const, name: str) -> None:
+        if const_name := ConstBase._format_const_name(name, None):
+            self._cache.put(self._key(const), const_name)
+
+    def save(self) -> None:
+        self._cache.save()
+
+    def _key(self, const: Const) -> str:
+        return hashlib.sha256(
+            repr(
+                (PROMPT_VERSION, self._model, const.is_formatted, const.value)
+            ).encode()
+        ).hexdigest()
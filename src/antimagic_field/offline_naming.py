@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import re
+import string
+from collections.abc import Iterable
+from collections.abc import Sequence
+from functools import lru_cache
+from typing import Optional
+
+from more_itertools import map_reduce
+
+from .constants.const import Const
+from .constants.const_base import ConstBase
+from .str_consts.src.antimagic_field import EMPTY
+from .str_consts.src.antimagic_field import UNDERSCORE
+
+_MAX_KEYWORDS = 3
+_MIN_HEX_LENGTH = 6
+_FORMATTED = "formatted"
+_CHUNK = re.compile(r"[A-Za-z0-9]+")
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_FIELD = re.compile(r"\{[^{}]*\}")
+_STOP_WORDS = frozenset(
+    """
+    a about after all an and any are as at be been before but by can could
+    do does for from had has have how if in into is it its may must no not
+    of on or our please should so such than that the their then there these
+    this those to was were what when which while who will with would you
+    your
+    """.split()
+)
+
+
+def offline_assign_names(
+    unique_unnamed: Iterable[Const],
+    const_names: set[str],
+    all_constants: Iterable[ConstBase],
+    named_constants: Iterable[ConstBase] = (),
+) -> Sequence[Const]:
+    """
+    Names constants from keywords of their values without asking a model.
+    A name taken by another value gets the lowest free numeric suffix.
+    Returns the constants whose value has no usable keywords.
+    """
+    name2values = map_reduce(
+        filter(lambda const: const.const_name, named_constants),
+        lambda const: const.const_name,
+        lambda const: const.value,
+        set,
+    )
+    value2name: dict[str, str] = {}
+    assigned_names = set()
+    unresolved = []
+    for const in unique_unnamed:
+        if (name := offline_name(const.value, const.is_formatted)) is None:
+            unresolved.append(const)
+            continue
+        candidate, suffix = name, 1
+        while candidate in assigned_names or (
+            candidate in const_names
+            and name2values.get(candidate) != {const.value}
+        ):
+            suffix += 1
+            candidate = f"{name}_{suffix}"
+        value2name[const.value] = candidate
+        assigned_names.add(candidate)
+    for constant in all_constants:
+        if isinstance(constant, Const) and (
+            name := value2name.get(constant.value)
+        ):
+            constant.set_const_name(name, EMPTY, None)
+            if (const_name := constant.const_name) is not None:
+                const_names.add(const_name)
+    return unresolved
+
+
+@lru_cache(maxsize=1 << 16)
+def offline_name(value: str, is_formatted: bool) -> Optional[str]:
+    """
+    Joins the (at most three) longest words of `value` in their original
+    order once replacement fields, stop words, numbers and hex-like runs are
+    dropped. Returns None when no word is left.
+    """
+    if not isinstance(value, str):
+        return None
+    words = tuple(
+        filter(
+            _is_keyword,
+            (
+                word.lower()
+                for chunk in _CHUNK.findall(_FIELD.sub(" ", value))
+                if not _is_hex_like(chunk)
+                for word in _WORD.findall(chunk)
+            ),
+        )
+    )
+    n_keywords = _MAX_KEYWORDS - is_formatted
+    keywords = sorted(
+        sorted(range(len(words)), key=lambda index: -len(words[index]))[
+            :n_keywords
+        ]
+    )
+    if not keywords:
+        return None
+    return ConstBase._format_const_name(
+        UNDERSCORE.join(
+            (
+                *map(words.__getitem__, keywords),
+                *((_FORMATTED,) if is_formatted else ()),
+            )
+        ),
+        None,
+    )
+
+
+def _is_keyword(word: str) -> bool:
+    return len(word) > 1 and not word.isdigit() and word not in _STOP_WORDS
+
+
+def _is_hex_like(word: str) -> bool:
+    return (
+        len(word) >= _MIN_HEX_LENGTH
+        and all(map(string.hexdigits.__contains__, word))
+        and any(map(str.isdigit, word))
+    )
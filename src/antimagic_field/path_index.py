@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from dataclasses import field
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Optional
+from typing import TYPE_CHECKING
+
+from .str_consts.src.antimagic_field import EMPTY
+from .str_consts.src.antimagic_field.path_index import INIT
+
+if TYPE_CHECKING:
+    from .config import Config
+
+_GLOB = re.compile(r"[*?[]")
+
+
+class PathIndex:
+    """
+    Path arithmetic of a single run. The root is the working directory when
+    the index is built (`main` changes into `config.root` first), excluded
+    paths are kept in a trie of path components and every file gets an id
+    under which its absolute parts, parts relative to the root, import path
+    and constants file are computed once.
+    """
+
+    def __init__(self, config: Config) -> None:
+        self.root = Path(os.getcwd())
+        self.consts_location_name = config.consts_location_name
+        self._excluded = _ExcludeNode()
+        for pattern in filter(None, config.exclude.split(",")):
+            self._excluded.add(self.root.joinpath(pattern).parts)
+        self._file_ids: dict[Path, int] = {}
+        self._absolute_parts: list[tuple[str, ...]] = []
+        self._relative_parts: list[Optional[tuple[str, ...]]] = []
+        self._is_excluded: list[Optional[bool]] = []
+        self._import_paths: list[Optional[str]] = []
+        self._import_filepaths: list[Optional[Path]] = []
+
+    def file_id(self, path: Path) -> int:
+        if (file_id := self._file_ids.get(path)) is not None:
+            return file_id
+        file_id = self._file_ids[path] = len(self._absolute_parts)
+        absolute_parts = self.root.joinpath(path).parts
+        root_parts = self.root.parts
+        self._absolute_parts.append(absolute_parts)
+        self._relative_parts.append(
+            absolute_parts[len(root_parts) :]
+            if absolute_parts[: len(root_parts)] == root_parts
+            else None
+        )
+        self._is_excluded.append(None)
+        self._import_paths.append(None)
+        self._import_filepaths.append(None)
+        return file_id
+
+    def absolute_parts(self, path: Path) -> tuple[str, ...]:
+        return self._absolute_parts[self.file_id(path)]
+
+    def relative_parts(self, path: Path) -> tuple[str, ...]:
+        if (parts := self._relative_parts[self.file_id(path)]) is None:
+            raise ValueError(f"{path} is not in the subpath of {self.root}")
+        return parts
+
+    def is_relative_to(self, path: Path, parent_path: Path) -> bool:
+        parent_parts = self.absolute_parts(parent_path)
+        return self.absolute_parts(path)[: len(parent_parts)] == parent_parts
+
+    def is_excluded(self, path: Path) -> bool:
+        file_id = self.file_id(path)
+        if (is_excluded := self._is_excluded[file_id]) is None:
+            is_excluded = self._is_excluded[file_id] = self._excluded.match(
+                self._absolute_parts[file_id]
+            )
+        return is_excluded
+
+    def import_path(self, path: Path) -> str:
+        """
+        Dotted import path of a python file (or of its package for an
+        `__init__.py`) relative to the root.
+        """
+        file_id = self.file_id(path)
+        if (import_path := self._import_paths[file_id]) is None:
+            import_path = self._import_paths[file_id] = ".".join(
+                Path(*self.relative_parts(path)).with_suffix(EMPTY).parts
+            ).removesuffix(INIT)
+        return import_path
+
+    def import_filepath(self, path: Path) -> Path:
+        """
+        Absolute path of the file in the constants directory that mirrors
+        `path` and holds the constants extracted from it.
+        """
+        file_id = self.file_id(path)
+        if (import_filepath := self._import_filepaths[file_id]) is None:
+            import_filepath = self._import_filepaths[file_id] = (
+                self.root.joinpath(
+                    self.consts_location_name, *self.relative_parts(path)
+                )
+            )
+        return import_filepath
+
+
+@dataclass(slots=True)
+class _ExcludeNode:
+    children: dict[str, _ExcludeNode] = field(default_factory=dict)
+    globs: dict[str, _ExcludeNode] = field(default_factory=dict)
+    excluded: bool = False
+
+    def add(self, parts: tuple[str, ...]) -> None:
+        node = self
+        for part in parts:
+            children = node.globs if _GLOB.search(part) else node.children
+            node = children.setdefault(part, _ExcludeNode())
+        node.excluded = True
+
+    def match(self, parts: tuple[str, ...]) -> bool:
+        """
+        Whether `parts` or one of its parents matches an excluded path. Glob
+        characters match within a single path component.
+        """
+        nodes = [self]
+        for part in parts:
+            if any(node.excluded for node in nodes):
+                return True
+            nodes = [
+                child
+                for node in nodes
+                for child in (
+                    *filter(None, (node.children.get(part),)),
+                    *(
+                        child
+                        for pattern, child in node.globs.items()
+                        if fnmatchcase(part, pattern)
+                    ),
+                )
+            ]
+            if not nodes:
+                return False
+        return any(node.excluded for node in nodes)
@@ -0,0 +1,392 @@
+from __future__ import annotations
+
+import re
+import sys
+from collections import Counter
+from collections.abc import Collection
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from functools import cache
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Optional
+
+from more_itertools import map_reduce
+
+from .ai_solve import ai_assign_names
+from .ai_solve import ai_solve_duplicates
+from .ai_solve import estimate_ai_requests
+from .config import Config
+from .constants.const import Const
+from .constants.const_base import ConstBase
+from .constants.previous_const import PreviousConst
+from .consts_manifest import ConstsManifest
+from .exceptions import FailedToSolveDuplicates
+from .formatting import format_files
+from .git_files import read_staged
+from .group2files import group2files
+from .offline_naming import offline_assign_names
+from .offline_naming import offline_name
+from .save2files import save2files
+from .scan_files import scan_files
+from .solve_duplicates import DuplicateIndex
+from .str_consts.src.antimagic_field import DIRECTORY
+from .str_consts.src.antimagic_field import IGNORE
+from .str_consts.src.antimagic_field import MOST_COMMON
+from .str_consts.src.antimagic_field import NEWLINE
+from .str_consts.src.antimagic_field import PY
+from .str_consts.src.antimagic_field import SPACE
+from .str_consts.src.antimagic_field.pipeline import AI
+from .str_consts.src.antimagic_field.pipeline import EXCEPTION
+from .str_consts.src.antimagic_field.pipeline import FOUND
+from .str_consts.src.antimagic_field.pipeline import OFFLINE
+from .transform.modify_file import modify_files
+from .walk_files import walk_files
+from .warm_index import WarmIndex
+
+
+def run_pipeline(config: Config, index: Optional[WarmIndex] = None) -> int:
+    """
+    Scans the files of `config`, names their constants, writes the constants
+    files and rewrites the scanned files. Kept apart from `main` so that
+    `--help` and argument errors do not import libcst and the model clients.
+    """
+    fail = 0
+    print(SPACE.join(sys.argv))
+    found_files: Iterable[Path] = filter(
+        lambda path: path.suffix == ".py"
+        and (
+            config.consts_location != DIRECTORY
+            or not path.is_relative_to(Path(config.consts_location_name))
+        )
+        and not config.is_excluded(path),
+        walk_files(config.pos_args, config),
+    )
+    sources = None
+    if config.staged:
+        found_files = tuple(found_files)
+        sources = read_staged(found_files)
+    elif not any(Path(pos_arg).is_dir() for pos_arg in config.pos_args):
+        found_files = tuple(found_files)
+    scanned_files = (index.scan_files if index else scan_files)(
+        found_files, config, sources
+    )
+    modified_files: Sequence[Path] = tuple(scanned_files)
+    modules = {
+        file: (module, source)
+        for file, (module, _, source) in scanned_files.items()
+    }
+    consts = tuple(
+        chain.from_iterable(
+            file_consts for _, file_consts, _ in scanned_files.values()
+        )
+    )
+    del scanned_files
+    consts, discarded_consts = _narrow_to_allowed(consts, config)
+    if config.consts_location == DIRECTORY:
+        consts_file_paths = Path(config.consts_location_name).rglob(PY)
+        predefined_constants: Sequence[PreviousConst] = tuple(
+            chain.from_iterable(
+                map(
+                    partial(index.read_consts, config=config),
+                    consts_file_paths,
+                )
+            )
+            if index
+            else ConstsManifest(config).read(consts_file_paths)
+        )
+    else:
+        raise ValueError("var_location can only be folder for now")
+    if config.difficult_string_solver == IGNORE:
+        consts = tuple(
+            filter(lambda const: const.const_name is not None, consts)
+        )
+    if sources and (unstaged_files := _unstaged_files(consts, sources)):
+        for filepath in filter(unstaged_files.__contains__, modified_files):
+            print(f"{filepath} has unstaged changes and was not modified")
+        modified_files = tuple(
+            filepath
+            for filepath in modified_files
+            if filepath not in unstaged_files
+        )
+        consts = tuple(
+            const
+            for const in consts
+            if const.origin_filepath not in unstaged_files
+        )
+        fail = 1
+    predefined_values = frozenset(
+        const.value for const in predefined_constants
+    )
+    if config.difficult_string_solver == EXCEPTION and (
+        difficult_constants := tuple(
+            filter(
+                lambda const: const.const_name is None
+                and const.value not in predefined_values,
+                consts,
+            )
+        )
+    ):
+        for filepath, magical_strings in map_reduce(
+            difficult_constants,
+            lambda const: const.origin_filepath,
+            lambda const: const.value,
+        ).items():
+            print(filepath, FOUND, NEWLINE.join(magical_strings))
+        return 1
+    all_consts = (*consts, *predefined_constants)
+    duplicate_index = DuplicateIndex(all_consts)
+    duplicates = duplicate_index.solve()
+    duplicate_values = frozenset(chain.from_iterable(duplicates.values()))
+    if duplicates and config.duplicates_solver == EXCEPTION:
+        for filepath, magical_strings in map_reduce(
+            (
+                const
+                for const in duplicate_index.with_values(duplicate_values)
+                if isinstance(const, Const)
+            ),
+            lambda const: const.origin_filepath,
+            lambda const: const.value,
+        ).items():
+            print(filepath, FOUND, NEWLINE.join(magical_strings))
+        return 1
+    const_names = set(const.const_name for const in all_consts)
+    ai_requests = 0
+    if unnamed_constants := tuple(
+        const
+        for const in all_consts
+        if isinstance(const, Const) and const.const_name is None
+    ):
+        unique_unnamed: Sequence[Const] = tuple(
+            {const.value: const for const in unnamed_constants}.values()
+        )
+        if config.offline_naming or config.difficult_string_solver == OFFLINE:
+            unique_unnamed = offline_assign_names(
+                unique_unnamed, const_names, unnamed_constants, all_consts
+            )
+        if config.difficult_string_solver == OFFLINE:
+            consts = tuple(
+                filter(lambda const: const.const_name is not None, consts)
+            )
+            all_consts = (*consts, *predefined_constants)
+            duplicate_index = DuplicateIndex(all_consts)
+        else:
+            if unique_unnamed:
+                ai_requests = ai_assign_names(
+                    unique_unnamed,
+                    config,
+                    const_names,
+                    unnamed_constants,
+                    named_constants=all_consts,
+                )
+            duplicate_index.update(unnamed_constants)
+    if config.difficult_string_solver == AI and (
+        avoided_requests := _avoided_ai_requests(discarded_consts, config)
+    ):
+        print(
+            f"AI naming used {ai_requests} requests instead of "
+            f"{ai_requests + avoided_requests} without narrowing to "
+            "allowed_consts"
+        )
+    if not consts and not duplicate_index.solve():
+        return 0
+    if config.modify is False and consts:
+        for filepath, magical_strings in map_reduce(
+            consts,
+            lambda const: const.origin_filepath,
+            lambda const: const.value,
+        ).items():
+            print(filepath, FOUND, NEWLINE.join(magical_strings))
+        return 1
+    if duplicates and config.duplicates_solver == AI:
+        try:
+            ai_solve_duplicates(duplicate_index, config, const_names)
+        except FailedToSolveDuplicates as e:
+            print(
+                f"Failed to solve for following duplicates {e.duplicate_values}"
+            )
+    elif config.duplicates_solver == MOST_COMMON:
+        all_consts = _solve_duplicates_most_common(
+            consts, predefined_constants, duplicate_index
+        )
+    elif config.duplicates_solver == IGNORE:
+        all_consts = _solve_duplicates_ignore(
+            consts, predefined_constants, duplicate_index
+        )
+    consts = tuple(filter(Const.__instancecheck__, all_consts))
+    predefined_constants = tuple(
+        filter(PreviousConst.__instancecheck__, all_consts)
+    )
+    grouped_files = group2files(all_consts, config)
+    del all_consts
+    file_switching_consts = map_reduce(
+        filter(
+            lambda const: all(
+                (
+                    const.previous_written_filepath,
+                    const.written_filepath,
+                    const.previous_written_filepath != const.written_filepath,
+                )
+            ),
+            predefined_constants,
+        ),
+        lambda const: const.previous_written_filepath.absolute(),
+    )
+    renamed_consts = map_reduce(
+        filter(
+            lambda const: all(
+                (
+                    const.const_name,
+                    const.previous_const_name,
+                    const.const_name != const.previous_const_name,
+                )
+            ),
+            predefined_constants,
+        ),
+        lambda const: (
+            const.previous_written_filepath or const.written_filepath
+        ).absolute(),
+    )
+    written_consts_files = save2files(
+        grouped_files, file_switching_consts, renamed_consts, config
+    )
+    grouped_consts = map_reduce(consts, lambda const: const.origin_filepath)
+    rewritten_files = []
+    for filepath in modified_files:
+        module, source = modules[filepath]
+        if sources and sources.get(filepath) != filepath.read_bytes():
+            module = source = None
+        rewritten_files.append(
+            (filepath, grouped_consts.get(filepath, []), module, source)
+        )
+    rewritten_filepaths = modify_files(
+        rewritten_files,
+        renamed_consts={
+            config.path_index.import_path(key): value
+            for key, value in renamed_consts.items()
+        },
+        config=config,
+    )
+    fail |= bool(rewritten_filepaths)
+    format_files((*written_consts_files, *rewritten_filepaths), config)
+    ConstsManifest(config).refresh(written_consts_files)
+    return fail and not config.suppress_fail
+
+
+def _unstaged_files(
+    consts: Iterable[Const], sources: Mapping[Path, bytes]
+) -> frozenset[Path]:
+    """
+    Files with constants to extract whose working tree differs from the
+    staged contents that were scanned. They are left out of the run before
+    anything is written so that no constants are generated for a file that
+    will not be rewritten.
+    """
+    return frozenset(
+        filepath
+        for filepath in {const.origin_filepath for const in consts}
+        if sources.get(filepath) != filepath.read_bytes()
+    )
+
+
+def _narrow_to_allowed(
+    consts: Sequence[Const], config: Config
+) -> tuple[tuple[Const, ...], tuple[Const, ...]]:
+    """
+    Splits `consts` into those matching `config.allowed_consts` and the rest
+    evaluating the pattern once per distinct value.
+    """
+    pattern = re.compile(config.allowed_consts)
+    is_allowed = cache(lambda value: pattern.search(value) is not None)
+    allowed: list[Const] = []
+    discarded: list[Const] = []
+    for const in consts:
+        (allowed if is_allowed(const.value) else discarded).append(const)
+    return tuple(allowed), tuple(discarded)
+
+
+def _avoided_ai_requests(
+    discarded_consts: Collection[Const], config: Config
+) -> int:
+    unique_unnamed = {
+        const.value: const
+        for const in discarded_consts
+        if const.const_name is None
+        and not (
+            config.offline_naming
+            and offline_name(const.value, const.is_formatted)
+        )
+    }.values()
+    return estimate_ai_requests(unique_unnamed, config)
+
+
+def _solve_duplicates_most_common(
+    consts: Collection[Const],
+    predefined_consts: Collection[PreviousConst],
+    duplicate_index: DuplicateIndex,
+) -> Sequence[ConstBase]:
+    value2const_name = _assign_command_names(
+        duplicate_index.solve(), predefined_consts
+    )
+    renamed = tuple(
+        const
+        for const in duplicate_index.with_values(value2const_name)
+        if isinstance(const, Const)
+    )
+    for const in renamed:
+        const.set_const_name(value2const_name[const.value], max_n_parts=None)
+    duplicate_index.update(renamed)
+    return (
+        *filter(
+            lambda const: value2const_name.get(const.value, const.const_name)
+            is not None,
+            consts,
+        ),
+        *predefined_consts,
+    )
+
+
+def _assign_command_names(
+    duplicates: dict[str, Sequence[str]],
+    predefined_consts: Collection[PreviousConst],
+) -> dict[str, Optional[str]]:
+    value2const_name = {}
+    value2const_name_predefined = {
+        const.value: const.const_name for const in predefined_consts
+    }
+    for key, values in duplicates.items():
+        counter = Counter(values)
+        for value in frozenset(values):
+            value2const_name[value] = None
+        if predefined_value := next(
+            filter(None, map(value2const_name_predefined.get, values)), None
+        ):
+            value2const_name[predefined_value] = key
+        else:
+            value2const_name[max(values, key=counter.get)] = key
+    return value2const_name
+
+
+def _solve_duplicates_ignore(
+    consts: Collection[Const],
+    predefined_consts: Collection[PreviousConst],
+    duplicate_index: DuplicateIndex,
+) -> Sequence[ConstBase]:
+    duplicate_values = frozenset(
+        chain.from_iterable(duplicate_index.solve().values())
+    )
+    duplicates = tuple(
+        const
+        for const in duplicate_index.with_values(duplicate_values)
+        if isinstance(const, Const)
+    )
+    for const in duplicates:
+        const.set_const_name(None)
+    duplicate_index.update(duplicates)
+    ignored = frozenset(map(id, duplicates))
+    return (
+        *(const for const in consts if id(const) not in ignored),
+        *predefined_consts,
+    )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import io
+import mmap
+import re
+import tokenize
+from ast import literal_eval
+from collections.abc import Callable
+from collections.abc import Iterable
+from functools import lru_cache
+from pathlib import Path
+from re import _parser  # type: ignore
+from typing import Optional
+from typing import Union
+
+from .config import Config
+
+
+def may_contain_consts(
+    filepath: Path, config: Config, content: Optional[bytes] = None
+) -> bool:
+    """
+    Cheap pass over the raw bytes of a file deciding whether any of its string
+    literals could pass `config.allowed_consts`. A string value is never
+    longer than its literal so literals shorter than the shortest possible
+    match are skipped and the rest are evaluated and matched exactly, except
+    for bytes and formatted strings which are kept conservatively.
+    """
+    if content is not None:
+        return _may_contain_consts(
+            content, io.BytesIO(content).readline, config
+        )
+    with filepath.open("rb") as file:
+        if not file.seek(0, 2):
+            return False
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return _may_contain_consts(mapped, mapped.readline, config)
+
+
+def _may_contain_consts(
+    content: Union[bytes, mmap.mmap],
+    readline: Callable[[], bytes],
+    config: Config,
+) -> bool:
+    min_length = _min_match_length(config.allowed_consts)
+    if not content or len(content) < min_length:
+        return False
+    if content.find(b'"') == -1 and content.find(b"'") == -1:
+        return False
+    try:
+        return _has_candidate(
+            tokenize.tokenize(readline),
+            re.compile(config.allowed_consts),
+            min_length,
+        )
+    except (SyntaxError, tokenize.TokenError):
+        return True
+
+
+def _has_candidate(
+    tokens: Iterable[tokenize.TokenInfo],
+    pattern: re.Pattern[str],
+    min_length: int,
+) -> bool:
+    fstring_starts = []
+    for token in tokens:
+        if token.type == tokenize.FSTRING_START:
+            fstring_starts.append(token.start)
+        elif token.type == tokenize.FSTRING_END:
+            (start_row, start_col), (end_row, end_col) = (
+                fstring_starts.pop(),
+                token.end,
+            )
+            if start_row != end_row or end_col - start_col >= min_length:
+                return True
+        elif token.type == tokenize.STRING and len(token.string) >= min_length:
+            if "f" in token.string.partition(token.string[-1])[0].lower():
+                return True
+            value = literal_eval(token.string)
+            if not isinstance(value, str) or pattern.search(value):
+                return True
+    return False
+
+
+@lru_cache
+def _min_match_length(pattern: str) -> int:
+    return _parser.parse(pattern).getwidth()[0]
@@ -17,8 +17,14 @@ from .str_consts.src.antimagic_field import R
 def read_consts(consts_file_path: Path, config: Config) -> list[PreviousConst]:
     if not consts_file_path.exists():
         return []
+    return parse_consts(consts_file_path.read_text(), consts_file_path, config)
+
+
+def parse_consts(
+    code: str, consts_file_path: Path, config: Config
+) -> list[PreviousConst]:
     visitor = _ConstantsGetter(consts_file_path, config)
-    libcst.parse_module(consts_file_path.read_text()).visit(visitor)
+    libcst.parse_module(code).visit(visitor)
     return visitor.consts
 
 
@@ -28,13 +34,14 @@ class _ConstantsGetter(libcst.CSTTransformer):
         self.config = config
         self.filepath = filepath
         self.consts = []
+        self._name2const: dict[str, PreviousConst] = {}
 
     def visit_Assign(self, node: "Assign") -> Optional[bool]:
         if len(node.targets) == 1 and isinstance(
             (target := node.targets[0].target), Name
         ):
             if isinstance(node.value, SimpleString):
-                self.consts.append(
+                self._add(
                     PreviousConst(
                         target.value.removesuffix(
                             self.config.const_name_suffix
@@ -45,19 +52,14 @@ class _ConstantsGetter(libcst.CSTTransformer):
                     )
                 )
             if isinstance(node.value, Name):
-                in_file_consts = next(
-                    filter(
-                        lambda const: const.const_name
-                        == node.value.value.removesuffix(
-                            self.config.const_name_suffix
-                        ),
-                        self.consts,
-                    ),
-                    None,
+                in_file_consts = self._name2const.get(
+                    node.value.value.removesuffix(
+                        self.config.const_name_suffix
+                    )
                 )
                 if not in_file_consts:
                     return super().visit_Assign(node)
-                self.consts.append(
+                self._add(
                     PreviousConst(
                         target.value.removesuffix(
                             self.config.const_name_suffix
@@ -72,7 +74,7 @@ class _ConstantsGetter(libcst.CSTTransformer):
         if isinstance((target := node.target), Name) and isinstance(
             node.value, SimpleString
         ):
-            self.consts.append(
+            self._add(
                 PreviousConst(
                     target.value.removesuffix(self.config.const_name_suffix),
                     node.value.evaluated_value,
@@ -81,3 +83,7 @@ class _ConstantsGetter(libcst.CSTTransformer):
                 )
             )
         return super().visit_AnnAssign(node)
+
+    def _add(self, const: PreviousConst) -> None:
+        self.consts.append(const)
+        self._name2const.setdefault(const.const_name, const)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import os
 from collections.abc import Mapping
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from .config import Config
@@ -16,18 +16,32 @@ def save2files(
     file_switching_consts: Mapping[Path, Sequence[PreviousConst]],
     renamed_consts: Mapping[Path, Sequence[PreviousConst]],
     config: Config,
-):
-    for path, consts in grouped_consts.items():
-        write_consts(
+) -> Sequence[Path]:
+    """
+    Writes every constants file and returns the ones whose content changed.
+    """
+    arguments = tuple(
+        (
             path,
             consts,
             file_switching_consts.get(path, []),
             renamed_consts.get(path, []),
             config,
         )
-    if config.formatting is not None:
-        os.system(
-            config.formatting.format(
-                filepaths=" ".join(map(str, grouped_consts.keys()))
-            ).replace(r"\n", "\n")
-        )
+        for path, consts in grouped_consts.items()
+    )
+    if config.jobs == 1 or len(arguments) < 2:
+        written = tuple(write_consts(*args) for args in arguments)
+    else:
+        with ThreadPoolExecutor(max_workers=config.jobs or None) as executor:
+            written = tuple(
+                future.result()
+                for future in tuple(
+                    executor.submit(write_consts, *args) for args in arguments
+                )
+            )
+    return tuple(
+        path
+        for path, is_written in zip(grouped_consts.keys(), written)
+        if is_written
+    )
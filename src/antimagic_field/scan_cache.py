@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Optional
+
+from .config import Config
+from .constants.const import Const
+from .constants.string_record import StringRecord
+from .utils.json_lru_cache import JsonLruCache
+
+_CACHE_VERSION = 3
+_FINGERPRINT_FIELDS = (
+    "include_annotations",
+    "allowed_consts",
+    "const_name_suffix",
+    "prefilter",
+    "detection_backend",
+)
+
+
+class ScanCache:
+    def __init__(self, cache: JsonLruCache, config: Config):
+        self._cache = cache
+        self._fingerprint = config_fingerprint(config)
+
+    @classmethod
+    def from_config(cls, config: Config) -> Optional[ScanCache]:
+        if config.cache_dir is None:
+            return None
+        return cls(
+            JsonLruCache(
+                config.cache_dir / "scan_cache.json", config.scan_cache_size
+            ),
+            config,
+        )
+
+    def key(self, content: bytes) -> str:
+        return hashlib.sha256(self._fingerprint + content).hexdigest()
+
+    def get(self, key: str, filepath: Path) -> Optional[Sequence[Const]]:
+        if (records := self._cache.get(key)) is None:
+            return None
+        return tuple(
+            Const(
+                StringRecord(value, is_formatted, is_rstring, (start, end)),
+                filepath,
+            )
+            for value, is_formatted, is_rstring, start, end in records
+        )
+
+    def put(self, key: str, consts: Sequence[Const]) -> None:
+        self._cache.put(
+            key,
+            [
+                [
+                    record.value,
+                    record.is_formatted,
+                    record.is_rstring,
+                    *record.span,
+                ]
+                for record in map(Const.record, consts)
+            ],
+        )
+
+    def save(self) -> None:
+        self._cache.save()
+
+
+def config_fingerprint(config: Config) -> bytes:
+    return json.dumps(
+        [_CACHE_VERSION]
+        + [getattr(config, field) for field in _FINGERPRINT_FIELDS]
+    ).encode()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import io
+import re
+from collections.abc import Iterable
+from collections.abc import Mapping
+from collections.abc import Sequence
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from pathlib import Path
+from typing import Optional
+
+from libcst import Module
+
+from .config import Config
+from .constants.const import Const
+from .extract_constants import extract_constants
+from .prefilter import may_contain_consts
+from .scan_cache import ScanCache
+
+ScannedFile = tuple[Optional[Module], Sequence[Const], Optional[str]]
+
+
+def scan_files(
+    filepaths: Iterable[Path],
+    config: Config,
+    sources: Optional[Mapping[Path, bytes]] = None,
+) -> dict[Path, ScannedFile]:
+    """
+    Scans `filepaths` in the order given. A sequence is handed to the worker
+    pool largest file first, while the files of any other iterable (such as
+    `walk_files`) are submitted as soon as they are found so that discovery
+    overlaps with parsing. The source text is kept for files with constants
+    so that they are not read again when they are rewritten. Workers send
+    back span records instead of libcst trees, which cost more to pickle
+    than re-parsing the few files the splice rewrite cannot handle.
+    """
+    sources = sources or {}
+    streamed = not isinstance(filepaths, Sequence)
+    scanned: dict[Path, ScannedFile] = {}
+    cache_keys = {}
+    cache = ScanCache.from_config(config)
+    with_spans = cache is not None or config.low_memory
+    found = []
+    pending: list[Path] = []
+    futures: dict[Path, Future[ScannedFile]] = {}
+    with ExitStack() as stack:
+        executor: Optional[ProcessPoolExecutor] = None
+
+        def submit(paths: Iterable[Path]) -> None:
+            nonlocal executor
+            if executor is None:
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=config.jobs or None)
+                )
+            for path in paths:
+                futures[path] = executor.submit(
+                    scan_file, path, config, True, sources.get(path), True
+                )
+
+        for filepath in filepaths:
+            found.append(filepath)
+            if cache:
+                content = (
+                    sources[filepath]
+                    if filepath in sources
+                    else filepath.read_bytes()
+                )
+                cache_keys[filepath] = cache.key(content)
+                if (
+                    consts := cache.get(cache_keys[filepath], filepath)
+                ) is not None:
+                    scanned[filepath] = (
+                        None,
+                        consts,
+                        _decode(content) if consts else None,
+                    )
+                    del cache_keys[filepath]
+                    continue
+            if config.prefilter and not may_contain_consts(
+                filepath, config, sources.get(filepath)
+            ):
+                scanned[filepath] = None, (), None
+                continue
+            pending.append(filepath)
+            if (
+                streamed
+                and config.jobs != 1
+                and len(futures) + len(pending) > 1
+            ):
+                submit(pending)
+                pending.clear()
+        if config.jobs == 1 or len(futures) + len(pending) < 2:
+            scanned.update(
+                (
+                    filepath,
+                    scan_file(
+                        filepath, config, with_spans, sources.get(filepath)
+                    ),
+                )
+                for filepath in pending
+            )
+        else:
+            submit(
+                sorted(
+                    pending, key=lambda path: path.stat().st_size, reverse=True
+                )
+            )
+        scanned.update(
+            (filepath, future.result()) for filepath, future in futures.items()
+        )
+    if cache:
+        for filepath, key in cache_keys.items():
+            cache.put(key, scanned[filepath][1])
+        cache.save()
+    return {filepath: scanned[filepath] for filepath in found}
+
+
+def scan_file(
+    filepath: Path,
+    config: Config,
+    with_spans: bool = False,
+    source: Optional[bytes] = None,
+    as_records: bool = False,
+) -> ScannedFile:
+    text = filepath.read_text() if source is None else _decode(source)
+    module, consts = extract_constants(
+        filepath=filepath,
+        source=text,
+        config=config,
+        with_spans=with_spans,
+    )
+    if config.prefilter:
+        consts = tuple(
+            filter(
+                lambda const: re.findall(config.allowed_consts, const.value),
+                consts,
+            )
+        )
+    if config.low_memory or as_records:
+        return (
+            None,
+            tuple(Const(const.record(), filepath) for const in consts),
+            text if consts else None,
+        )
+    return module, consts, text if consts else None
+
+
+def _decode(content: bytes) -> str:
+    """
+    Decodes file contents the way `Path.read_text` does, with the locale
+    encoding and universal newlines.
+    """
+    return io.TextIOWrapper(io.BytesIO(content)).read()
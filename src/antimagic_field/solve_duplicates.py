@@ -1,10 +1,11 @@
 from __future__ import annotations
 
+from collections import defaultdict
 from collections.abc import Collection
 from collections.abc import Iterable
 from collections.abc import Sequence
-
-from more_itertools import map_reduce
+from itertools import chain
+from typing import Optional
 
 from .constants.const_base import ConstBase
 from .str_consts.src.antimagic_field.solve_duplicates import CAPITALIZED
@@ -15,54 +16,115 @@ from .str_consts.src.antimagic_field.solve_duplicates import UPPERCASE
 def solve_duplicates(
     constants: Collection[ConstBase],
 ) -> dict[str, Sequence[str]]:
-    duplicates = _get_duplicates(constants)
-    for const_name, values in tuple(duplicates.items()):
-        values = tuple(frozenset(values))
-        if len(values) > 2:
-            continue
-        for i in (0, 1):
-            first, second = i, not i
-            if values[first].capitalize() == values[second]:
-                tuple(
-                    const.set_const_name(
-                        const.const_name,
-                        LOWERCASE,
+    return DuplicateIndex(constants).solve()
+
+
+class DuplicateIndex:
+    """
+    Name to value and value to constant index over a fixed set of constants.
+    Names changed outside of the index are picked up by `update`, so finding
+    duplicates is a lookup of the conflicting names and resolving them only
+    touches the constants holding the conflicting values.
+    """
+
+    def __init__(self, constants: Iterable[ConstBase]):
+        self._constants: list[ConstBase] = []
+        self._names: list[Optional[str]] = []
+        self._positions: dict[int, int] = {}
+        self._by_value: dict[str, list[int]] = defaultdict(list)
+        self._by_name: dict[str, dict[str, set[int]]] = {}
+        self._conflicts: set[str] = set()
+        for position, const in enumerate(constants):
+            self._constants.append(const)
+            self._names.append(None)
+            self._positions[id(const)] = position
+            self._by_value[const.value].append(position)
+            self._index(position)
+
+    def update(self, constants: Iterable[ConstBase]) -> None:
+        for const in constants:
+            position = self._positions[id(const)]
+            if const.const_name != self._names[position]:
+                self._unindex(position)
+                self._index(position)
+
+    def with_values(self, values: Iterable[str]) -> Sequence[ConstBase]:
+        return tuple(
+            map(
+                self._constants.__getitem__,
+                sorted(
+                    chain.from_iterable(
+                        self._by_value.get(value, ()) for value in values
                     )
-                    for const in constants
-                    if const.value == values[first]
-                )
-                tuple(
-                    const.set_const_name(const.const_name, CAPITALIZED)
-                    for const in constants
-                    if const.value == values[second]
-                )
-                del duplicates[const_name]
-                break
-            if values[first].upper() == values[second]:
-                tuple(
-                    const.set_const_name(const.const_name, LOWERCASE)
-                    for const in constants
-                    if const.value == values[first]
-                )
-                tuple(
-                    const.set_const_name(const.const_name, UPPERCASE)
-                    for const in constants
-                    if const.value == values[second]
+                ),
+            )
+        )
+
+    def duplicates(self) -> dict[str, Sequence[str]]:
+        conflicts = sorted(
+            (
+                (
+                    const_name,
+                    sorted(
+                        chain.from_iterable(self._by_name[const_name].values())
+                    ),
                 )
-                del duplicates[const_name]
-                break
-    return duplicates
+                for const_name in self._conflicts
+            ),
+            key=lambda conflict: conflict[1][0],
+        )
+        return {
+            const_name: tuple(
+                self._constants[position].value for position in positions
+            )
+            for const_name, positions in conflicts
+        }
 
+    def solve(self) -> dict[str, Sequence[str]]:
+        duplicates = self.duplicates()
+        for const_name, values in tuple(duplicates.items()):
+            values = tuple(frozenset(values))
+            if len(values) > 2:
+                continue
+            for i in (0, 1):
+                first, second = i, not i
+                if values[first].capitalize() == values[second]:
+                    self._add_suffix(values[first], LOWERCASE)
+                    self._add_suffix(values[second], CAPITALIZED)
+                    del duplicates[const_name]
+                    break
+                if values[first].upper() == values[second]:
+                    self._add_suffix(values[first], LOWERCASE)
+                    self._add_suffix(values[second], UPPERCASE)
+                    del duplicates[const_name]
+                    break
+        return duplicates
 
-def _get_duplicates(
-    constants: Iterable[ConstBase],
-) -> dict[str, Sequence[str]]:
-    return {
-        const_name: values
-        for const_name, values in map_reduce(
-            constants,
-            lambda const: const.const_name,
-            lambda const: const.value,
-        ).items()
-        if len(frozenset(values)) > 1 and const_name is not None
-    }
+    def _add_suffix(self, value: str, suffix: str) -> None:
+        constants = self.with_values((value,))
+        for const in constants:
+            const.set_const_name(const.const_name, suffix)
+        self.update(constants)
+
+    def _index(self, position: int) -> None:
+        const = self._constants[position]
+        self._names[position] = const_name = const.const_name
+        if const_name is None:
+            return
+        values = self._by_name.setdefault(const_name, {})
+        values.setdefault(const.value, set()).add(position)
+        if len(values) > 1:
+            self._conflicts.add(const_name)
+
+    def _unindex(self, position: int) -> None:
+        if (const_name := self._names[position]) is None:
+            return
+        values = self._by_name[const_name]
+        value = self._constants[position].value
+        values[value].discard(position)
+        if not values[value]:
+            del values[value]
+        if len(values) < 2:
+            self._conflicts.discard(const_name)
+        if not values:
+            del self._by_name[const_name]
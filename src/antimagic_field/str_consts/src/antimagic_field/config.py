@@ -12,4 +12,8 @@ FORMATTED: Final[Literal["--{}"]] = "--{}"
 GENERATED_CONSTANTS: Final[Literal["generated_constants"]] = (
     "generated_constants"
 )
+JOURNAL: Final[Literal[".antimagic_field_journal"]] = (
+    ".antimagic_field_journal"
+)
 POS_ARGS: Final[Literal["pos_args"]] = "pos_args"
+SOCKET: Final[Literal[".antimagic_field.sock"]] = ".antimagic_field.sock"
@@ -0,0 +1,6 @@
+from __future__ import annotations
+
+from typing import Final
+from typing import Literal
+
+MANIFEST: Final[Literal[".manifest.json"]] = ".manifest.json"
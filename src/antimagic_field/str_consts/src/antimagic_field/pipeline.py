@@ -6,3 +6,4 @@ from typing import Literal
 AI: Final[Literal["ai"]] = "ai"
 EXCEPTION: Final[Literal["exception"]] = "exception"
 FOUND: Final[Literal["found:"]] = "found:"
+OFFLINE: Final[Literal["offline"]] = "offline"
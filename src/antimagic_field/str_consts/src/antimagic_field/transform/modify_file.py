@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from typing import Final
+from typing import Literal
+
+CST: Final[Literal["cst"]] = "cst"
+VERIFY: Final[Literal["verify"]] = "verify"
@@ -0,0 +1,7 @@
+from __future__ import annotations
+
+from typing import Final
+from typing import Literal
+
+GIT: Final[Literal[".git"]] = ".git"
+GITIGNORE: Final[Literal[".gitignore"]] = ".gitignore"
@@ -1,21 +1,216 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
+import glob
+import json
+import os
+import shutil
+from collections.abc import Iterator
 from contextlib import contextmanager
+from contextlib import suppress
+from hashlib import sha1
 from pathlib import Path
+from typing import Optional
+from uuid import uuid4
 
+from .config import Config
 from .str_consts.src.antimagic_field.transaction import CHANGES_REVERTED
 
 
 @contextmanager
-def transation(pos_args: Iterable[str]):
-    paths = tuple(map(Path, pos_args))
-    contents = tuple(path.read_text() for path in paths)
+def transation(config: Config) -> Iterator[None]:
+    for orphan in Journal.orphans(config):
+        orphan.rollback()
+        print(f"Restored files left by an interrupted run from {orphan.path}")
+    journal = Journal.begin(config)
     try:
         yield
     except BaseException:
         print("Reverting changes please wait until process is done...")
-        for path, content in zip(paths, contents):
-            path.write_text(content)
+        journal.rollback()
         print(CHANGES_REVERTED)
         raise
+    journal.commit()
+
+
+def journaled_write(path: Path, contents: str, config: Config) -> None:
+    Journal.from_config(config).write_text(path, contents)
+
+
+class Journal:
+    """
+    Copy-on-write journal of the files a run changes. A file is copied into
+    the journal only right before its first write and writes go through a
+    temporary file and a rename. Every snapshot and every directory the run
+    creates is recorded in its own entry so worker processes can share the
+    journal. Each run journals into its own subdirectory next to a lock file
+    named after the run and the process owning it (its PID and, where
+    `/proc` is available, its start time so a reused PID is not mistaken
+    for the owner), so concurrent runs never touch each other's entries and
+    a journal is only rolled back by a later run once its owner is dead.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+
+    @classmethod
+    def from_config(cls, config: Config) -> Journal:
+        if config._journal_run is None:
+            raise ValueError("Files can only be written inside a transation")
+        return cls(_journal_dir(config).joinpath(config._journal_run))
+
+    @classmethod
+    def begin(cls, config: Config) -> Journal:
+        journal_dir = _journal_dir(config)
+        journal_dir.mkdir(parents=True, exist_ok=True)
+        config._journal_run = run = uuid4().hex
+        journal_dir.joinpath(f"{run}.{_owner()}.lock").touch(exist_ok=False)
+        return cls(journal_dir.joinpath(run))
+
+    @classmethod
+    def orphans(cls, config: Config) -> Iterator[Journal]:
+        """
+        Journals whose owner is no longer running. Each one is claimed by
+        renaming its lock file to this process first, so two runs starting
+        together never roll back the same journal.
+        """
+        journal_dir = _journal_dir(config)
+        if not journal_dir.is_dir():
+            return
+        for lock_path in journal_dir.glob("*.lock"):
+            run, _, owner = lock_path.stem.partition(".")
+            if not owner.partition("-")[0].isdigit() or _is_running(owner):
+                continue
+            try:
+                os.rename(
+                    lock_path, journal_dir.joinpath(f"{run}.{_owner()}.lock")
+                )
+            except FileNotFoundError:
+                continue
+            yield cls(journal_dir.joinpath(run))
+
+    def write_text(self, path: Path, contents: str) -> None:
+        self._snapshot(path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text(contents)
+        if path.exists():
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+
+    def rollback(self) -> None:
+        """
+        Restores the journaled files and removes the directories the run
+        created, together with the temporary files of writes its processes
+        did not finish.
+        """
+        entries = []
+        for entry_path in self.path.glob("*.json"):
+            entry = json.loads(entry_path.read_text())
+            entries.append((entry_path, entry))
+        for entry_path, entry in sorted(
+            entries,
+            key=lambda item: (
+                item[1].get("directory", False),
+                -len(Path(item[1]["path"]).parts),
+            ),
+        ):
+            if entry.get("directory"):
+                with suppress(OSError):
+                    os.rmdir(entry["path"])
+            else:
+                _remove_stale_tmp_files(Path(entry["path"]))
+                if entry["existed"]:
+                    Path(entry["path"]).parent.mkdir(
+                        parents=True, exist_ok=True
+                    )
+                    os.replace(entry_path.with_suffix(""), entry["path"])
+                else:
+                    Path(entry["path"]).unlink(missing_ok=True)
+            entry_path.unlink()
+        self.commit()
+
+    def commit(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+        for lock_path in self.path.parent.glob(f"{self.path.name}.*.lock"):
+            lock_path.unlink(missing_ok=True)
+        with suppress(OSError):
+            self.path.parent.rmdir()
+
+    def _snapshot(self, path: Path) -> None:
+        path = path.absolute()
+        entry_path = self._entry_path(path)
+        if entry_path.exists():
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+        missing = tuple(
+            parent for parent in path.parents if not parent.exists()
+        )
+        for directory in reversed(missing):
+            self._record(directory, existed=False, directory=True)
+            directory.mkdir(exist_ok=True)
+        if existed := path.exists():
+            shutil.copy2(path, entry_path.with_suffix(""))
+        self._record(path, existed=existed)
+
+    def _record(self, path: Path, **entry: bool) -> None:
+        entry_path = self._entry_path(path)
+        tmp_path = entry_path.with_name(f"{entry_path.stem}.{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps({"path": str(path), **entry}))
+        os.replace(tmp_path, entry_path)
+
+    def _entry_path(self, path: Path) -> Path:
+        return self.path.joinpath(
+            sha1(str(path).encode()).hexdigest() + ".json"
+        )
+
+
+def _journal_dir(config: Config) -> Path:
+    return Path(config.root).joinpath(config.journal_dir)
+
+
+def _owner() -> str:
+    pid = os.getpid()
+    start_time = _start_time(pid)
+    return f"{pid}-{start_time}" if start_time else str(pid)
+
+
+def _is_running(owner: str) -> bool:
+    pid, _, start_time = owner.partition("-")
+    if not _is_pid_running(int(pid)):
+        return False
+    return not start_time or _start_time(int(pid)) in (None, start_time)
+
+
+def _is_pid_running(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _start_time(pid: int) -> Optional[str]:
+    """
+    Start time of a process in clock ticks since boot, which tells it apart
+    from a later process reusing its PID. None where `/proc` is missing.
+    """
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return None
+    return stat.rpartition(")")[2].split()[19]
+
+
+def _remove_stale_tmp_files(path: Path) -> None:
+    """
+    Removes the `.{name}.{pid}.tmp` files `write_text` left next to `path`
+    when a process stopped between writing and renaming them, except those
+    of processes still running.
+    """
+    for tmp_path in path.parent.glob(f".{glob.escape(path.name)}.*.tmp"):
+        pid = tmp_path.name[len(path.name) + 2 : -len(".tmp")]
+        if pid.isdigit() and (
+            int(pid) == os.getpid() or not _is_pid_running(int(pid))
+        ):
+            tmp_path.unlink(missing_ok=True)
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import ast
+import io
+import re
+import tokenize
+from collections.abc import Sequence
+from operator import attrgetter
+from typing import Any
+from typing import cast
+from typing import TypeGuard
+from typing import Union
+
+from libcst import ensure_type
+from libcst import Expr
+from libcst import FormattedString
+from libcst import parse_module
+from libcst import SimpleStatementLine
+from libcst import SimpleString
+
+from ..config import Config
+from ..constants.string_record import StringRecord
+from ..str_consts.src.antimagic_field import R
+from ..str_consts.src.antimagic_field.transform.magic_seeker import LITERAL
+from ..str_consts.src.antimagic_field.transform.magic_seeker import TYPE_VAR
+from ..utils.formated_string2string import formated_string2string
+from ..utils.get_spans import get_spans
+from .magic_seeker import MagicSeeker
+
+
+class AstMagicSeeker(ast.NodeVisitor):
+    """
+    Finds the same magic strings as `MagicSeeker` using the stdlib `ast`
+    module. Implicitly concatenated strings and f-strings are delegated to
+    `MagicSeeker` on a libcst parse of just their own source segment.
+    """
+
+    def __init__(self, source: str, config: Config):
+        self.config = config
+        self._source = source.encode()
+        self._line_offsets = (
+            0,
+            *(match.end() for match in re.finditer(b"\n", self._source)),
+        )
+        self._simple_strings: list[StringRecord] = list()
+        self._formated_strings: list[StringRecord] = list()
+        self._excluded_strings: set[Union[ast.Constant, ast.JoinedStr]] = set()
+        self._excluded_subtrees: set[ast.AST] = set()
+        self._excluded_depth = 0
+
+    def visit(self, node: ast.AST) -> Any:
+        if node not in self._excluded_subtrees:
+            return super().visit(node)
+        self._excluded_depth += 1
+        try:
+            return super().visit(node)
+        finally:
+            self._excluded_depth -= 1
+
+    def visit_Module(self, node: ast.Module) -> None:
+        self._excluded_strings.update(self._get_docstrings(node.body))
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        self._excluded_strings.update(self._get_docstrings(node.body))
+        self.generic_visit(node)
+
+    def visit_FunctionDef(
+        self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef]
+    ) -> None:
+        self._excluded_strings.update(self._get_docstrings(node.body))
+        if node.returns:
+            self._excluded_subtrees.add(node.returns)
+        self.generic_visit(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_arg(self, node: ast.arg) -> None:
+        if node.annotation:
+            self._excluded_subtrees.add(node.annotation)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node: ast.AnnAssign) -> None:
+        self._excluded_subtrees.add(node.annotation)
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if (
+            isinstance(name := node.targets[0], ast.Name)
+            and name.id.isupper()
+            and self._is_string(node.value)
+        ):
+            self._excluded_strings.add(node.value)
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        if (
+            isinstance(node.func, ast.Name)
+            and node.func.id == TYPE_VAR
+            and (arguments := (*node.args, *node.keywords))
+        ):
+            first = min(arguments, key=attrgetter("lineno", "col_offset"))
+            if isinstance(first, ast.keyword):
+                first = first.value
+            elif isinstance(first, ast.Starred):
+                first = first.value
+            if isinstance(first, ast.Constant) and self._is_string(first):
+                self._excluded_strings.add(first)
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        if isinstance(node.value, ast.Name) and node.value.id == LITERAL:
+            self._excluded_subtrees.update((node.value, node.slice))
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        if self._is_string(node):
+            self._visit_string(node)
+
+    def visit_JoinedStr(self, node: ast.JoinedStr) -> None:
+        self._visit_string(node)
+
+    def _visit_string(self, node: Union[ast.Constant, ast.JoinedStr]) -> None:
+        if self._excluded_depth and not self.config.include_annotations:
+            return
+        start, end = self._span(node)
+        segment = self._source[start:end].decode()
+        if isinstance(node, ast.Constant) and not _is_concatenated(segment):
+            if (
+                self.config.include_annotations
+                or node not in self._excluded_strings
+            ):
+                self._simple_strings.append(
+                    StringRecord(
+                        # bytes literals are kept like libcst evaluates them
+                        cast(str, node.value),
+                        False,
+                        _prefix(segment).lower() == R,
+                        (start, end),
+                    )
+                )
+            return
+        segment_source = f"({segment})\n"
+        module = parse_module(segment_source)
+        expression = ensure_type(
+            ensure_type(module.body[0], SimpleStatementLine).body[0], Expr
+        ).value
+        string_nodes = MagicSeeker.get_magical_strings(expression, self.config)
+        if node in self._excluded_strings and isinstance(
+            expression, FormattedString
+        ):
+            string_nodes = tuple(
+                filter(
+                    lambda string_node: string_node is not expression,
+                    string_nodes,
+                )
+            )
+        for string_node, (node_start, node_end) in zip(
+            string_nodes, get_spans(module, string_nodes, segment_source)
+        ):
+            span = start - 1 + node_start, start - 1 + node_end
+            if isinstance(string_node, SimpleString):
+                self._simple_strings.append(
+                    StringRecord(
+                        cast(str, string_node.evaluated_value),
+                        False,
+                        string_node.prefix == R,
+                        span,
+                    )
+                )
+            else:
+                self._formated_strings.append(
+                    StringRecord(
+                        formated_string2string(string_node), True, False, span
+                    )
+                )
+
+    def _get_docstrings(
+        self, body: Sequence[ast.stmt]
+    ) -> tuple[Union[ast.Constant, ast.JoinedStr], ...]:
+        return tuple(
+            statement.value
+            for statement in body
+            if isinstance(statement, ast.Expr)
+            and self._is_string(statement.value)
+            and self._starts_line(statement)
+        )
+
+    def _starts_line(self, node: ast.stmt) -> bool:
+        line_start = self._line_offsets[node.lineno - 1]
+        return not self._source[
+            line_start : line_start + node.col_offset
+        ].strip()
+
+    def _span(self, node: ast.expr) -> tuple[int, int]:
+        if node.end_lineno is None or node.end_col_offset is None:
+            raise ValueError(f"{ast.dump(node)} has no end position")
+        return (
+            self._line_offsets[node.lineno - 1] + node.col_offset,
+            self._line_offsets[node.end_lineno - 1] + node.end_col_offset,
+        )
+
+    @staticmethod
+    def _is_string(
+        node: ast.expr,
+    ) -> TypeGuard[Union[ast.Constant, ast.JoinedStr]]:
+        return isinstance(node, ast.JoinedStr) or (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, (str, bytes))
+        )
+
+    @classmethod
+    def get_magical_strings(
+        cls, source: str, config: Config
+    ) -> Sequence[StringRecord]:
+        seeker = cls(source, config)
+        seeker.visit(ast.parse(source))
+        by_span = attrgetter("span")
+        return (
+            *sorted(seeker._simple_strings, key=by_span),
+            *sorted(seeker._formated_strings, key=by_span),
+        )
+
+
+def _is_concatenated(segment: str) -> bool:
+    return (
+        sum(
+            token.type == tokenize.STRING
+            for token in tokenize.generate_tokens(
+                io.StringIO(f"({segment})").readline
+            )
+        )
+        > 1
+    )
+
+
+def _prefix(segment: str) -> str:
+    return segment[: len(segment) - len(segment.lstrip("rRbBuU"))]
@@ -1,8 +1,6 @@
 from __future__ import annotations
 
 from collections.abc import Sequence
-from itertools import chain
-from itertools import filterfalse
 from typing import Optional
 from typing import Union
 
@@ -35,24 +33,32 @@ class MagicSeeker(Visitor):
         super().__init__(config)
         self._simple_strings: list["SimpleString"] = list()
         self._formated_strings: list["FormattedString"] = list()
-        self._simple_string_consts_assignment: list[
+        self._excluded_strings: set[
             Union["SimpleString", "FormattedString"]
-        ] = list()
-        self._string_annotations: list["SimpleString"] = list()
-        self._typevar_strings: list["SimpleString"] = list()
-        self._docstrings: list[Union["SimpleString", "FormattedString"]] = (
-            list()
-        )
-        self._strings_in_concatenated: list[
-            Union["SimpleString", "FormattedString"]
-        ] = list()
+        ] = set()
+        self._excluded_subtrees: set[CSTNode] = set()
+        self._excluded_context: list[CSTNode] = list()
+
+    def on_visit(self, node: "CSTNode") -> bool:
+        visit_children = super().on_visit(node)
+        if node in self._excluded_subtrees:
+            self._excluded_context.append(node)
+        return visit_children
+
+    def on_leave(self, original_node: "CSTNode") -> None:
+        super().on_leave(original_node)
+        if (
+            self._excluded_context
+            and self._excluded_context[-1] is original_node
+        ):
+            self._excluded_context.pop()
 
     def visit_ClassDef_body(self, node: "ClassDef") -> None:
-        self._docstrings.extend(self._get_docstrings(node.body))
+        self._excluded_strings.update(self._get_docstrings(node.body))
         return super().visit_ClassDef_body(node)
 
     def visit_FunctionDef_body(self, node: "FunctionDef") -> None:
-        self._docstrings.extend(self._get_docstrings(node.body))
+        self._excluded_strings.update(self._get_docstrings(node.body))
         return super().visit_FunctionDef_body(node)
 
     def visit_Assign(self, node: "Assign") -> Optional[bool]:
@@ -61,30 +67,31 @@ class MagicSeeker(Visitor):
             and name.value.isupper()
             and isinstance(node.value, (SimpleString, FormattedString))
         ):
-            self._simple_string_consts_assignment.append(node.value)
+            self._excluded_strings.add(node.value)
         return super().visit_Assign(node)
 
     def visit_SimpleString(self, node: "SimpleString") -> Optional[bool]:
-        self._simple_strings.append(node)
+        if self.config.include_annotations or self._is_magical(node):
+            self._simple_strings.append(node)
         return super().visit_SimpleString(node)
 
     def visit_FormattedString(self, node: "FormattedString") -> Optional[bool]:
-        self._formated_strings.append(node)
+        if not self.config.include_annotations and self._is_magical(node):
+            self._formated_strings.append(node)
         return super().visit_FormattedString(node)
 
     def visit_Annotation(self, node: "Annotation") -> Optional[bool]:
-        self._string_annotations.extend(
-            self.get_magical_strings(node.annotation, self.config)
-        )
+        self._excluded_subtrees.add(node)
         return super().visit_Annotation(node)
 
     def visit_Call(self, node: "Call") -> Optional[bool]:
         if (
             isinstance(node.func, Name)
             and node.func.value == TYPE_VAR
+            and node.args
             and isinstance(node.args[0].value, SimpleString)
         ):
-            self._typevar_strings.append(node.args[0].value)
+            self._excluded_strings.add(node.args[0].value)
         return super().visit_Call(node)
 
     def visit_Subscript(self, node: "Subscript") -> Optional[bool]:
@@ -93,66 +100,40 @@ class MagicSeeker(Visitor):
             and isinstance(value, Name)
             and value.value == LITERAL
         ):
-            self._string_annotations.extend(
-                chain.from_iterable(
-                    self.get_magical_strings(child, self.config)
-                    for child in node.children
-                )
-            )
+            self._excluded_subtrees.add(node)
         return super().visit_Subscript(node)
 
     def visit_ConcatenatedString(
         self, node: "ConcatenatedString"
     ) -> Optional[bool]:
-        self._strings_in_concatenated.extend(
-            chain.from_iterable(
-                (
-                    (
-                        [node.left]
-                        if isinstance(
-                            node.left, (SimpleString, FormattedString)
-                        )
-                        else self.get_magical_strings(node.left, self.config)
-                    ),
-                    (
-                        [node.right]
-                        if isinstance(
-                            node.right, (SimpleString, FormattedString)
-                        )
-                        else self.get_magical_strings(node.right, self.config)
-                    ),
-                )
-            )
-        )
+        for part in (node.left, node.right):
+            if isinstance(part, (SimpleString, FormattedString)):
+                self._excluded_strings.add(part)
+            else:
+                self._excluded_subtrees.add(part)
         return super().visit_ConcatenatedString(node)
 
+    def _is_magical(
+        self, node: Union["SimpleString", "FormattedString"]
+    ) -> bool:
+        return (
+            not self._excluded_context and node not in self._excluded_strings
+        )
+
     @classmethod
     def get_magical_strings(
         cls, module: CSTNode, config: Config
     ) -> Sequence[Union["SimpleString", "FormattedString"]]:
         seeker = cls(config)
         if isinstance(module, Module):
-            seeker._docstrings.extend(seeker._get_docstrings(module))
+            seeker._excluded_strings.update(seeker._get_docstrings(module))
         module.visit(seeker)
-        if config.include_annotations:
-            return seeker._simple_strings
-        return tuple(
-            filterfalse(
-                (
-                    seeker._string_annotations
-                    + seeker._docstrings
-                    + seeker._strings_in_concatenated
-                    + seeker._typevar_strings
-                    + seeker._simple_string_consts_assignment
-                ).__contains__,
-                seeker._simple_strings + seeker._formated_strings,
-            )
-        )
+        return (*seeker._simple_strings, *seeker._formated_strings)
 
     @classmethod
     def _get_docstrings(
         cls,
-        node: "BaseSuite",
+        node: Union["BaseSuite", "Module"],
     ) -> tuple[Union["SimpleString", "FormattedString"], ...]:
         return tuple(filter(None, map(cls._get_docstring, node.body)))
 
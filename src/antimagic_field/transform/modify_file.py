@@ -1,43 +1,147 @@
 from __future__ import annotations
 
+import io
 from collections.abc import Collection
+from collections.abc import Iterable
 from collections.abc import Mapping
 from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from operator import itemgetter
 from pathlib import Path
+from typing import Optional
 
 from libcst import Module
+from libcst import parse_module
 from more_itertools import map_reduce
 
 from ..config import Config
 from ..constants.const import Const
 from ..constants.previous_const import PreviousConst
-from ..filepath2import_path import filepath2import_path
+from ..constants.string_record import StringRecord
+from ..extract_constants import attach_string_nodes
 from ..str_consts.src.antimagic_field import COMA_SPACE
 from ..str_consts.src.antimagic_field import EMPTY
+from ..str_consts.src.antimagic_field.transform.modify_file import CST
+from ..str_consts.src.antimagic_field.transform.modify_file import VERIFY
+from ..transaction import journaled_write
+from ..utils.get_spans import get_spans
 from .magic_remover import MagicRemover
+from .splice_remover import splice_consts
+
+
+def modify_files(
+    files: Iterable[
+        tuple[Path, Collection[Const], Optional[Module], Optional[str]]
+    ],
+    renamed_consts: Mapping[str, Sequence[PreviousConst]],
+    config: Config,
+) -> Sequence[Path]:
+    """
+    Runs `modify_file` for every file, spreading the rewrites over
+    `config.jobs` processes when there is more than one, and returns the
+    files that were rewritten. Workers capture what they print and it is
+    replayed in file order so the output does not depend on scheduling.
+    """
+    files = tuple(filter(itemgetter(1), files))
+    if config.jobs == 1 or len(files) < 2:
+        return tuple(
+            filepath
+            for filepath, consts, module, source in files
+            if modify_file(
+                filepath, consts, module, source, renamed_consts, config
+            )
+        )
+    modified = []
+    with ProcessPoolExecutor(max_workers=config.jobs or None) as executor:
+        for filepath, future in tuple(
+            (
+                filepath,
+                executor.submit(
+                    _modify_file_captured,
+                    filepath,
+                    consts,
+                    module,
+                    source,
+                    renamed_consts,
+                    config,
+                ),
+            )
+            for filepath, consts, module, source in files
+        ):
+            is_modified, output = future.result()
+            print(output, end=EMPTY)
+            if is_modified:
+                modified.append(filepath)
+    return modified
+
+
+def _modify_file_captured(
+    filepath: Path,
+    consts: Collection[Const],
+    module: Optional[Module],
+    source: Optional[str],
+    renamed_consts: Mapping[str, Sequence[PreviousConst]],
+    config: Config,
+) -> tuple[int, str]:
+    with redirect_stdout(io.StringIO()) as output:
+        fail = modify_file(
+            filepath, consts, module, source, renamed_consts, config
+        )
+    return fail, output.getvalue()
 
 
 def modify_file(
     filepath: Path,
     consts: Collection[Const],
-    module: Module,
+    module: Optional[Module],
+    source: Optional[str],
     renamed_consts: Mapping[str, Sequence[PreviousConst]],
     config: Config,
 ) -> int:
+    """
+    Replaces the constants of `filepath` with their names. `source` is the
+    text the constants were scanned from, the file is only read when it is
+    not given.
+    """
     if not consts:
         return 0
-    code = filepath.read_text()
-    new_code = module.visit(
-        MagicRemover(
-            config,
-            {
-                const.string_node: const.const_name + config.const_name_suffix
-                for const in consts
-                if const.const_name
-            },
-            renamed_consts,
+    code = filepath.read_text() if source is None else source
+    new_code = None
+    if config.rewrite_engine != CST:
+        spans: Sequence[Optional[tuple[int, int]]] = tuple(
+            const.span for const in consts
         )
-    ).code
+        if None in spans and module is not None:
+            string_nodes = tuple(
+                const.string_node
+                for const in consts
+                if not isinstance(const.string_node, StringRecord)
+            )
+            if len(string_nodes) == len(consts):
+                spans = get_spans(module, string_nodes, code)
+        new_code = splice_consts(code, tuple(zip(spans, consts)), config)
+    if new_code is None or config.rewrite_engine == VERIFY:
+        if module is None:
+            module = parse_module(code)
+            attach_string_nodes(module, code, consts, config)
+        cst_code = module.visit(
+            MagicRemover(
+                config,
+                {
+                    const.string_node: (
+                        const.const_name + config.const_name_suffix
+                    )
+                    for const in consts
+                    if const.const_name
+                    and not isinstance(const.string_node, StringRecord)
+                },
+                renamed_consts,
+            )
+        ).code
+        if new_code is not None and new_code != cst_code:
+            print(f"Spliced and libcst rewrites of {filepath} differ")
+        new_code = cst_code
     before, annotations_import, rest = new_code.rpartition(
         "from __future__ import annotations\n"
     )
@@ -45,7 +149,7 @@ def modify_file(
         before
         + annotations_import
         + EMPTY.join(
-            f"from {filepath2import_path(source)} import {COMA_SPACE.join(frozenset(map(lambda const: const.const_name + config.const_name_suffix, source_consts)))}\n"
+            f"from {config.path_index.import_path(source)} import {COMA_SPACE.join(frozenset(map(lambda const: const.const_name + config.const_name_suffix, source_consts)))}\n"
             for source, source_consts in map_reduce(
                 consts, lambda const: const.get_import_filepath(config)
             ).items()
@@ -53,7 +157,7 @@ def modify_file(
         + rest
     )
     if new_code != code:
-        filepath.write_text(new_code)
+        journaled_write(filepath, new_code, config)
         print(f"File {filepath} was modified")
         return 1
     return 0
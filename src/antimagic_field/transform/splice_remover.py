@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import keyword
+import tokenize
+from bisect import bisect_left
+from collections.abc import Collection
+from collections.abc import Sequence
+from operator import itemgetter
+from typing import Optional
+
+from ..config import Config
+from ..constants.const import Const
+from ..utils.tokens import Tokens
+
+_Edit = tuple[int, int, str, Optional[Sequence[tuple[int, int]]]]
+_OPENING = frozenset("([{")
+_CLOSING = frozenset(")]}")
+_FIELD_ENDS = frozenset(("!", ":", "=", "}"))
+
+
+def splice_consts(
+    code: str,
+    spanned_consts: Collection[tuple[Optional[tuple[int, int]], Const]],
+    config: Config,
+) -> Optional[str]:
+    """
+    Produces the code `MagicRemover` would by splicing constant names into the
+    source at the byte span of each literal. Parentheses owned by a literal
+    are replaced along with it and formatted strings become `NAME.format(...)`
+    over the source of their expressions. Returns None when a span is missing
+    or does not line up with the tokens of `code`.
+    """
+    try:
+        tokens = _Tokens(code)
+    except (SyntaxError, tokenize.TokenError):
+        return None
+    edits = []
+    for span, const in spanned_consts:
+        if not const.const_name:
+            continue
+        if span is None or (edit := tokens.edit(span, const, config)) is None:
+            return None
+        edits.append(edit)
+    edits.sort(key=lambda edit: (edit[0], -edit[1]))
+    spliced = _splice(tokens.source, 0, len(tokens.source), edits)
+    return None if spliced is None else spliced.decode()
+
+
+class _Tokens(Tokens):
+    def edit(
+        self, span: tuple[int, int], const: Const, config: Config
+    ) -> Optional[_Edit]:
+        if not (const_name := const.const_name):
+            return None
+        start, end = span
+        first = bisect_left(self.starts, start)
+        if first == len(self.starts) or self.starts[first] != start:
+            return None
+        last, arguments = first, None
+        if const.is_formatted:
+            if self.types[first] != tokenize.FSTRING_START:
+                return None
+            last, arguments = self._format_arguments(first)
+        elif self.types[first] != tokenize.STRING:
+            return None
+        if self.ends[last] != end:
+            return None
+        owned = self._owned_parentheses(first, last)
+        return (
+            self.starts[first - owned],
+            self.ends[last + owned],
+            const_name + config.const_name_suffix,
+            arguments,
+        )
+
+    def _owned_parentheses(self, first: int, last: int) -> int:
+        owned = 0
+        while (
+            first - owned > 0
+            and last + owned + 1 < len(self.strings)
+            and self.strings[first - owned - 1] == "("
+            and self.strings[last + owned + 1] == ")"
+            and not self._ends_atom(first - owned - 2)
+        ):
+            owned += 1
+        return owned
+
+    def _ends_atom(self, index: int) -> bool:
+        if index < 0:
+            return False
+        if self.types[index] == tokenize.NAME:
+            return not keyword.iskeyword(self.strings[index])
+        return (
+            self.types[index]
+            in (tokenize.NUMBER, tokenize.STRING, tokenize.FSTRING_END)
+            or self.strings[index] in _CLOSING
+        )
+
+    def _format_arguments(
+        self, first: int
+    ) -> tuple[int, Sequence[tuple[int, int]]]:
+        arguments: list[tuple[int, int]] = []
+        depth = 0
+        expression_start = None
+        index = first + 1
+        while index < len(self.types):
+            token_type, string = self.types[index], self.strings[index]
+            if token_type == tokenize.FSTRING_END and not depth:
+                return index, arguments
+            if token_type == tokenize.FSTRING_START:
+                index = self._format_arguments(index)[0] + 1
+                continue
+            if token_type == tokenize.OP:
+                if (
+                    depth == 1
+                    and expression_start is not None
+                    and string in _FIELD_ENDS
+                ):
+                    arguments.append(
+                        (self.starts[expression_start], self.ends[index - 1])
+                    )
+                    expression_start = None
+                if string in _OPENING:
+                    depth += 1
+                    if depth == 1:
+                        expression_start = index + 1
+                elif string in _CLOSING:
+                    depth -= 1
+            index += 1
+        raise tokenize.TokenError("Unterminated formatted string")
+
+
+def _splice(
+    source: bytes, start: int, end: int, edits: Sequence[_Edit]
+) -> Optional[bytes]:
+    spliced = []
+    position = start
+    index = bisect_left(edits, start, key=itemgetter(0))
+    while index < len(edits) and edits[index][0] < end:
+        edit_start, edit_end, const_name, arguments = edits[index]
+        if edit_end > end:
+            return None
+        spliced.append(source[position:edit_start])
+        spliced.append(const_name.encode())
+        if arguments is not None:
+            formatted = []
+            for argument in arguments:
+                if (
+                    argument_source := _splice(source, *argument, edits)
+                ) is None:
+                    return None
+                formatted.append(argument_source)
+            spliced.append(b".format(" + b", ".join(formatted) + b")")
+        position = edit_end
+        index = bisect_left(edits, edit_end, index, key=itemgetter(0))
+    spliced.append(source[position:end])
+    return b"".join(spliced)
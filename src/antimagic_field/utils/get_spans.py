@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Union
+
+from libcst import CSTVisitor
+from libcst import FormattedString
+from libcst import Module
+from libcst import SimpleString
+
+from .tokens import Tokens
+
+
+def get_spans(
+    module: Module,
+    string_nodes: Sequence[Union["SimpleString", "FormattedString"]],
+    source: str,
+) -> Sequence[tuple[int, int]]:
+    """
+    Byte spans of `string_nodes` in `source`, the code `module` was parsed
+    from. Every string node is paired with the string token at the same
+    position in source order, libcst's byte span metadata is off after some
+    whitespace such as the one in `except Error :`.
+    """
+    if not string_nodes:
+        return ()
+    collector = _StringCollector()
+    module.visit(collector)
+    node2span = dict(zip(collector.strings, Tokens(source).string_spans()))
+    return tuple(map(node2span.__getitem__, string_nodes))
+
+
+class _StringCollector(CSTVisitor):
+    def __init__(self) -> None:
+        super().__init__()
+        self.strings: list[Union["SimpleString", "FormattedString"]] = []
+
+    def visit_SimpleString(self, node: "SimpleString") -> None:
+        self.strings.append(node)
+
+    def visit_FormattedString(self, node: "FormattedString") -> None:
+        self.strings.append(node)
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any
+from typing import Optional
+
+
+class JsonLruCache:
+    """
+    Least recently used entries persisted as JSON. The file is rewritten
+    when an entry was added (and others possibly evicted) or when a hit
+    changed the recency order, so that eviction follows use and not
+    insertion. A run whose hits leave the order as saved does not pay for
+    dumping it again.
+    """
+
+    def __init__(self, path: Path, max_entries: int):
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: dict[str, Any] = self._load()
+        self._dirty = False
+
+    def get(self, key: str) -> Optional[Any]:
+        if (value := self._entries.get(key)) is None:
+            return None
+        if next(reversed(self._entries)) != key:
+            del self._entries[key]
+            self._entries[key] = value
+            self._dirty = True
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        self._dirty = True
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        for key in tuple(self._entries)[: -self.max_entries or None]:
+            del self._entries[key]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self._entries))
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
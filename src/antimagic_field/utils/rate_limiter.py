@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+_WINDOW = 60.0
+
+
+class RateLimiter:
+    """
+    Sliding one-minute window limiting how many requests and how many
+    (estimated) tokens can be started. A request larger than the whole token
+    budget is let through once the window is empty instead of waiting forever.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+    ) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._started: deque[tuple[float, int]] = deque()
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: int) -> None:
+        async with self._lock:
+            while (delay := self._delay(tokens)) > 0:
+                await asyncio.sleep(delay)
+            self._started.append((time.monotonic(), tokens))
+            self._tokens += tokens
+
+    def _delay(self, tokens: int) -> float:
+        now = time.monotonic()
+        while self._started and now - self._started[0][0] >= _WINDOW:
+            self._tokens -= self._started.popleft()[1]
+        if not self._started or (
+            (
+                self.requests_per_minute is None
+                or len(self._started) < self.requests_per_minute
+            )
+            and (
+                self.tokens_per_minute is None
+                or self._tokens + tokens <= self.tokens_per_minute
+            )
+        ):
+            return 0
+        return _WINDOW - (now - self._started[0][0])
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import io
+import tokenize
+from collections.abc import Sequence
+
+_SKIPPED = frozenset(
+    (
+        tokenize.COMMENT,
+        tokenize.NL,
+        tokenize.NEWLINE,
+        tokenize.INDENT,
+        tokenize.DEDENT,
+        tokenize.ENDMARKER,
+        tokenize.FSTRING_MIDDLE,
+    )
+)
+
+
+class Tokens:
+    """
+    Significant tokens of `code` as parallel lists with UTF-8 byte offsets
+    into `source`, the same offsets spans of string literals are kept in.
+    """
+
+    def __init__(self, code: str):
+        self.source = code.encode()
+        lines = [line + "\n" for line in code.split("\n")]
+        line_starts = [0]
+        for line in lines:
+            line_starts.append(line_starts[-1] + len(line.encode()))
+        ascii_lines = tuple(map(str.isascii, lines))
+        self.starts: list[int] = []
+        self.ends: list[int] = []
+        self.types: list[int] = []
+        self.strings: list[str] = []
+        for token in tokenize.generate_tokens(io.StringIO(code).readline):
+            if token.type in _SKIPPED:
+                continue
+            self.starts.append(
+                _offset(lines, line_starts, ascii_lines, *token.start)
+            )
+            self.ends.append(
+                _offset(lines, line_starts, ascii_lines, *token.end)
+            )
+            self.types.append(token.type)
+            self.strings.append(token.string)
+
+    def string_spans(self) -> Sequence[tuple[int, int]]:
+        spans = []
+        fstring_starts = []
+        for index, token_type in enumerate(self.types):
+            if token_type == tokenize.STRING:
+                spans.append((self.starts[index], self.ends[index]))
+            elif token_type == tokenize.FSTRING_START:
+                fstring_starts.append(self.starts[index])
+            elif token_type == tokenize.FSTRING_END:
+                spans.append((fstring_starts.pop(), self.ends[index]))
+        return sorted(spans)
+
+
+def _offset(
+    lines: Sequence[str],
+    line_starts: Sequence[int],
+    ascii_lines: Sequence[bool],
+    row: int,
+    column: int,
+) -> int:
+    if ascii_lines[row - 1]:
+        return line_starts[row - 1] + column
+    return line_starts[row - 1] + len(lines[row - 1][:column].encode())
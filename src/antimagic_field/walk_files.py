@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+from .config import Config
+from .str_consts.src.antimagic_field import DIRECTORY
+from .str_consts.src.antimagic_field.walk_files import GIT
+from .str_consts.src.antimagic_field.walk_files import GITIGNORE
+
+_GLOB_TOKEN = re.compile(r"\*\*/|\*\*|\*|\?|\[[^\]]*\]|[^*?[]+")
+
+
+def walk_files(pos_args: Iterable[str], config: Config) -> Iterator[Path]:
+    """
+    Yields the positional arguments with every directory replaced by the
+    python files below it as soon as they are found. Excluded directories,
+    directories ignored by a `.gitignore` (from the root down) and the
+    generated constants directory are pruned before they are descended into.
+    """
+    for pos_arg in pos_args:
+        path = Path(pos_arg)
+        if path.is_dir():
+            yield from _walk(path, config)
+        else:
+            yield path
+
+
+def _walk(top: Path, config: Config) -> Iterator[Path]:
+    path_index = config.path_index
+    consts_directory = (
+        Path(config.consts_location_name)
+        if config.consts_location == DIRECTORY
+        else None
+    )
+    stack = [(top, _parent_rules(top, config))]
+    while stack:
+        directory, rules = stack.pop()
+        if config.gitignore:
+            rules = (*rules, *_read_gitignore(directory, config))
+        try:
+            with os.scandir(directory) as iterator:
+                entries = sorted(iterator, key=lambda entry: entry.name)
+        except OSError:
+            continue
+        subdirectories = []
+        for entry in entries:
+            path = directory / entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if (
+                    entry.name == GIT
+                    or path_index.is_excluded(path)
+                    or (
+                        consts_directory is not None
+                        and path_index.is_relative_to(path, consts_directory)
+                    )
+                    or _is_ignored(path, True, rules, config)
+                ):
+                    continue
+                subdirectories.append((path, rules))
+            elif (
+                entry.name.endswith(".py")
+                and entry.is_file()
+                and not _is_ignored(path, False, rules, config)
+            ):
+                yield path
+        stack.extend(reversed(subdirectories))
+
+
+@dataclass(slots=True)
+class _IgnoreRule:
+    base: tuple[str, ...]
+    pattern: re.Pattern[str]
+    negated: bool
+    directory_only: bool
+
+    def matches(self, parts: tuple[str, ...], is_directory: bool) -> bool:
+        if self.directory_only and not is_directory:
+            return False
+        return (
+            self.pattern.fullmatch("/".join(parts[len(self.base) :]))
+            is not None
+        )
+
+
+def _is_ignored(
+    path: Path,
+    is_directory: bool,
+    rules: Sequence[_IgnoreRule],
+    config: Config,
+) -> bool:
+    ignored = False
+    parts = config.path_index.absolute_parts(path)
+    for rule in rules:
+        if ignored == rule.negated and rule.matches(parts, is_directory):
+            ignored = not rule.negated
+    return ignored
+
+
+def _parent_rules(top: Path, config: Config) -> tuple[_IgnoreRule, ...]:
+    """
+    Rules of the `.gitignore` files between the root and `top` (exclusive)
+    so that walking a subdirectory ignores the same files as walking the
+    root would.
+    """
+    if not config.gitignore:
+        return ()
+    path_index = config.path_index
+    parts = path_index.absolute_parts(top)
+    root_parts = path_index.root.parts
+    if parts[: len(root_parts)] != root_parts:
+        return ()
+    return tuple(
+        rule
+        for depth in range(len(root_parts), len(parts))
+        for rule in _read_gitignore(Path(*parts[:depth]), config)
+    )
+
+
+def _read_gitignore(directory: Path, config: Config) -> list[_IgnoreRule]:
+    try:
+        lines = directory.joinpath(GITIGNORE).read_text().splitlines()
+    except (OSError, UnicodeDecodeError):
+        return []
+    base = config.path_index.absolute_parts(directory)
+    rules = []
+    for line in lines:
+        line = line.rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        line = line.removeprefix("!").removeprefix("\\")
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        rules.append(
+            _IgnoreRule(
+                base,
+                re.compile(
+                    ("" if anchored else "(?:.*/)?")
+                    + _translate(line.removeprefix("/"))
+                ),
+                negated,
+                directory_only,
+            )
+        )
+    return rules
+
+
+def _translate(pattern: str) -> str:
+    """
+    Regular expression of a gitignore glob matched against a path relative
+    to the directory of its `.gitignore`.
+    """
+    return "".join(
+        {
+            "**/": "(?:.*/)?",
+            "**": ".*",
+            "*": "[^/]*",
+            "?": "[^/]",
+        }.get(
+            token,
+            (
+                token.replace("[!", "[^", 1)
+                if token.startswith("[")
+                else re.escape(token)
+            ),
+        )
+        for token in _GLOB_TOKEN.findall(pattern)
+    )
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from collections.abc import Iterable
+from collections.abc import Mapping
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional
+from typing import Union
+
+from libcst import FormattedString
+from libcst import Module
+from libcst import SimpleString
+
+from .config import Config
+from .constants.const import Const
+from .constants.previous_const import PreviousConst
+from .constants.string_record import StringRecord
+from .read_consts import read_consts
+from .scan_cache import config_fingerprint
+from .scan_files import scan_files
+from .scan_files import ScannedFile
+
+_Stamp = tuple[int, int]
+_StringNode = Union[SimpleString, FormattedString, StringRecord]
+
+
+class WarmIndex:
+    """
+    Results of `scan_files` and `read_consts` kept in memory between runs of
+    the daemon. Entries are keyed by absolute path and validated against the
+    file stat so only files touched since the previous run are parsed again.
+    Parsed modules are immutable and shared, fresh `Const` and
+    `PreviousConst` objects are handed out on every lookup.
+    """
+
+    def __init__(self) -> None:
+        self._scanned: dict[
+            tuple[bytes, Path],
+            tuple[
+                Optional[_Stamp],
+                Optional[Module],
+                tuple[_StringNode, ...],
+                Optional[str],
+            ],
+        ] = {}
+        self._previous: dict[
+            tuple[str, Path],
+            tuple[Optional[_Stamp], tuple[PreviousConst, ...]],
+        ] = {}
+        self._configs: dict[Union[bytes, str], Config] = {}
+
+    def scan_files(
+        self,
+        filepaths: Iterable[Path],
+        config: Config,
+        sources: Optional[Mapping[Path, bytes]] = None,
+    ) -> dict[Path, ScannedFile]:
+        if sources:
+            return scan_files(filepaths, config, sources)
+        filepaths = tuple(filepaths)
+        fingerprint = config_fingerprint(config)
+        self._configs[fingerprint] = config
+        stamps = dict(zip(filepaths, map(_stamp, filepaths)))
+        self._store_scanned(
+            fingerprint,
+            stamps,
+            scan_files(
+                tuple(
+                    filter(
+                        lambda filepath: not self._is_fresh(
+                            (fingerprint, filepath.absolute()),
+                            stamps[filepath],
+                        ),
+                        filepaths,
+                    )
+                ),
+                config,
+            ),
+        )
+        scanned: dict[Path, ScannedFile] = {}
+        for filepath in filepaths:
+            _, module, string_nodes, source = self._scanned[
+                fingerprint, filepath.absolute()
+            ]
+            scanned[filepath] = (
+                module,
+                tuple(
+                    Const(string_node, filepath)
+                    for string_node in string_nodes
+                ),
+                source,
+            )
+        return scanned
+
+    def read_consts(
+        self, consts_file_path: Path, config: Config
+    ) -> list[PreviousConst]:
+        key = config.const_name_suffix, consts_file_path.absolute()
+        self._configs[config.const_name_suffix] = config
+        stamp = _stamp(consts_file_path)
+        if key not in self._previous or self._previous[key][0] != stamp:
+            self._previous[key] = stamp, tuple(
+                read_consts(consts_file_path, config)
+            )
+        return [
+            replace(const, written_filepath=consts_file_path)
+            for const in self._previous[key][1]
+        ]
+
+    def refresh(self) -> None:
+        """
+        Re-parses every indexed file that changed or disappeared since it was
+        indexed so that the next run only has to compare stats.
+        """
+        stale: defaultdict[bytes, dict[Path, Optional[_Stamp]]] = defaultdict(
+            dict
+        )
+        for fingerprint, filepath in tuple(self._scanned):
+            stamp = _stamp(filepath)
+            if stamp is None:
+                del self._scanned[fingerprint, filepath]
+            elif stamp != self._scanned[fingerprint, filepath][0]:
+                stale[fingerprint][filepath] = stamp
+        for fingerprint, stamps in stale.items():
+            self._store_scanned(
+                fingerprint,
+                stamps,
+                scan_files(tuple(stamps), self._configs[fingerprint]),
+            )
+        for suffix, consts_file_path in tuple(self._previous):
+            if _stamp(consts_file_path) is None:
+                del self._previous[suffix, consts_file_path]
+            else:
+                self.read_consts(consts_file_path, self._configs[suffix])
+
+    def _is_fresh(
+        self, key: tuple[bytes, Path], stamp: Optional[_Stamp]
+    ) -> bool:
+        return key in self._scanned and self._scanned[key][0] == stamp
+
+    def _store_scanned(
+        self,
+        fingerprint: bytes,
+        stamps: Mapping[Path, Optional[_Stamp]],
+        scanned: Mapping[Path, ScannedFile],
+    ) -> None:
+        for filepath, (module, consts, source) in scanned.items():
+            self._scanned[fingerprint, filepath.absolute()] = (
+                stamps[filepath],
+                module,
+                tuple(const.string_node for const in consts),
+                source,
+            )
+
+
+def _stamp(filepath: Path) -> Optional[_Stamp]:
+    try:
+        stat = os.stat(filepath)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
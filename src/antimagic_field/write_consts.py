@@ -1,25 +1,20 @@
 from __future__ import annotations
 
+import ast
+from collections import Counter
 from collections.abc import Collection
 from collections.abc import Sequence
 from itertools import chain
 from itertools import filterfalse
-from operator import attrgetter
+from operator import itemgetter
 from pathlib import Path
 from typing import Optional
 
-import libcst
-from libcst import Assign
-from libcst import ImportAlias
-from libcst import ImportFrom
-from libcst import Module
-from libcst import Name
 from more_itertools import map_reduce
 
 from .config import Config
 from .constants.const_base import ConstBase
 from .constants.previous_const import PreviousConst
-from .filepath2import_path import filepath2import_path
 from .str_consts.src.antimagic_field import COMA_SPACE
 from .str_consts.src.antimagic_field import DOUBLE_QUOTES
 from .str_consts.src.antimagic_field import EMPTY
@@ -27,7 +22,7 @@ from .str_consts.src.antimagic_field import NEWLINE
 from .str_consts.src.antimagic_field import R
 from .str_consts.src.antimagic_field import UNDERSCORE
 from .str_consts.src.antimagic_field.write_consts import N
-from .str_consts.src.antimagic_field.write_consts import VALUE
+from .transaction import journaled_write
 
 
 def write_consts(
@@ -36,53 +31,30 @@ def write_consts(
     moved_consts: Collection[PreviousConst],
     renamed_consts: Collection[PreviousConst],
     config: Config,
-):
+) -> bool:
     if not consts:
-        return
-    consts_file_path.parent.mkdir(exist_ok=True, parents=True)
+        return False
     name_translator = {
         const.previous_const_name: const.const_name for const in renamed_consts
     }
     moved_consts_str = EMPTY
     code = consts_file_path.read_text() if consts_file_path.exists() else EMPTY
-    previous_moved_consts = []
-    module = libcst.parse_module(code)
-
-    class PreviousImportsExtractor(libcst.CSTVisitor):
-        def visit_Assign(self, node: "Assign") -> Optional[bool]:
-            if (
-                len(node.targets) != 1
-                or node.targets[0].target.value != UNDERSCORE
-            ):
-                return super().visit_Assign(node)
-            node.value.visit(ElementVisitor())
-            return super().visit_Assign(node)
-
-    class ElementVisitor(libcst.CSTVisitor):
-        def visit_Name(self, node: "Name") -> Optional[bool]:
-            previous_moved_consts.append(node.value)
-            return super().visit_Name(node)
-
-    module.visit(PreviousImportsExtractor())
-    previous_moved_consts_imports = []
-
-    class ImportsExtractor(libcst.CSTVisitor):
-        def visit_ImportFrom(self, node: "ImportFrom") -> Optional[bool]:
-            previous_moved_consts_imports.extend(
-                f"from {'.'.join(map(attrgetter(VALUE), filter(Name.__instancecheck__, node.module.children + [node.module])))} import {alias.name.value}"
-                for alias in filter(ImportAlias.__instancecheck__, node.names)
-                if alias.name.value in previous_moved_consts
-            )
-            return super().visit_ImportFrom(node)
-
-    module.visit(ImportsExtractor())
+    module = ast.parse(code)
+    reader = _ConstsFileReader(code)
+    reader.visit(module)
+    previous_moved_consts = frozenset(reader.moved_names)
+    previous_moved_consts_imports = [
+        f"from {module} import {name}"
+        for module, name in reader.imports
+        if name in previous_moved_consts
+    ]
     if moved_consts or previous_moved_consts_imports:
         moved_consts_str = (
             NEWLINE.join(
                 sorted(
                     {
                         *tuple(
-                            f"from {filepath2import_path(const.written_filepath)} import {const.const_name}{config.const_name_suffix}"
+                            f"from {config.path_index.import_path(const.written_filepath)} import {const.const_name}{config.const_name_suffix}"
                             for const in moved_consts
                         ),
                         *previous_moved_consts_imports,
@@ -114,7 +86,9 @@ def write_consts(
         for _, values in map_reduce(consts, lambda const: const.value).items()
         if len(values) > 1
     )
-    duplicate_consts = tuple(chain.from_iterable(duplicate_const_groups))
+    duplicate_consts = frozenset(
+        map(id, chain.from_iterable(duplicate_const_groups))
+    )
     contents = (
         "from typing import Final\n"
         + moved_consts_str
@@ -123,7 +97,7 @@ def write_consts(
                 frozenset(
                     _line(name, const)
                     for name, const in zip(names, consts)
-                    if const not in duplicate_consts
+                    if id(const) not in duplicate_consts
                 ).union(
                     _line(
                         name_translator.get(
@@ -138,25 +112,15 @@ def write_consts(
         )
     )
 
-    previous_assignments = []
-
-    class PreviousAssignmentExtractor(libcst.CSTVisitor):
-        def visit_Assign(self, node: "Assign") -> Optional[bool]:
-            if (
-                len(node.targets) == 1
-                and isinstance(node.children[1], Name)
-                and isinstance(node.targets[0].target, Name)
-                and node.targets[0].target.value not in (*names, UNDERSCORE)
-                and node.targets[0].target.value != node.children[1].value
-            ):
-                previous_assignments.append(NEWLINE + Module([node]).code)
-            return super().visit_Assign(node)
-
-    module.visit(PreviousAssignmentExtractor())
+    previous_assignments = [
+        NEWLINE + assignment
+        for target, assignment in reader.aliases
+        if target not in (*names, UNDERSCORE)
+    ]
     contents = contents.replace('"\n"', N)
     contents += EMPTY.join(
         filterfalse(
-            previous_assignments.__contains__,
+            frozenset(previous_assignments).__contains__,
             chain.from_iterable(
                 (
                     (
@@ -176,7 +140,165 @@ def write_consts(
         )
     )
     contents += EMPTY.join(previous_assignments)
-    consts_file_path.write_text(contents)
+    existing = _statements(module)
+    wanted = _statements(ast.parse(contents))
+    if Counter(map(itemgetter(0), existing)) == Counter(
+        map(itemgetter(0), wanted)
+    ):
+        return False
+    journaled_write(
+        consts_file_path,
+        _edit(code, existing, contents, wanted) or contents,
+        config,
+    )
+    return True
+
+
+class _ConstsFileReader(ast.NodeVisitor):
+    """
+    Collects in one pass what `write_consts` keeps from an existing constants
+    file: names listed in the `_ = ...` re-export, `from ... import` pairs and
+    `NAME = OTHER_NAME` aliases with their source text.
+    """
+
+    def __init__(self, code: str):
+        self._lines = code.encode().splitlines(keepends=True)
+        self.moved_names: list[str] = []
+        self.imports: list[tuple[str, str]] = []
+        self.aliases: list[tuple[str, str]] = []
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        if len(node.targets) == 1 and isinstance(
+            target := node.targets[0], ast.Name
+        ):
+            if target.id == UNDERSCORE:
+                self.moved_names.extend(
+                    name.id
+                    for name in ast.walk(node.value)
+                    if isinstance(name, ast.Name)
+                )
+            elif isinstance(node.value, ast.Name) and target.id != (
+                node.value.id
+            ):
+                self.aliases.append((target.id, self._segment(node)))
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        self.imports.extend(
+            (node.module or EMPTY, alias.name) for alias in node.names
+        )
+        self.generic_visit(node)
+
+    def _segment(self, node: ast.stmt) -> str:
+        lines = self._lines[node.lineno - 1 : node.end_lineno]
+        lines[-1] = lines[-1][: node.end_col_offset]
+        lines[0] = lines[0][node.col_offset :]
+        return EMPTY.join(line.decode() for line in lines)
+
+
+def _statements(module: ast.Module) -> list[tuple[str, ast.stmt]]:
+    """
+    Top level statements of a constants file keyed by their ast dump, with
+    every name of a `from ... import` keyed on its own. Formatting does not
+    change the keys, so a formatted file compares equal to the text it was
+    formatted from.
+    """
+    statements: list[tuple[str, ast.stmt]] = []
+    for statement in module.body:
+        if isinstance(statement, ast.ImportFrom):
+            statements.extend(
+                (
+                    ast.dump(
+                        ast.ImportFrom(
+                            statement.module, [alias], statement.level
+                        )
+                    ),
+                    statement,
+                )
+                for alias in statement.names
+            )
+        else:
+            statements.append((ast.dump(statement), statement))
+    return statements
+
+
+def _edit(
+    code: str,
+    existing: Sequence[tuple[str, ast.stmt]],
+    contents: str,
+    wanted: Sequence[tuple[str, ast.stmt]],
+) -> Optional[str]:
+    """
+    `code` with the assignments missing from `contents` removed and the new
+    ones appended, so the rest of the file keeps its formatting. None when
+    imports, the `_` re-export or an assignment still referenced by a kept
+    one change, and the file is written whole.
+    """
+    wanted_keys = frozenset(map(itemgetter(0), wanted))
+    existing_keys = frozenset(map(itemgetter(0), existing))
+    removed = [
+        statement for key, statement in existing if key not in wanted_keys
+    ]
+    added = [
+        statement for key, statement in wanted if key not in existing_keys
+    ]
+    kept = [statement for key, statement in existing if key in wanted_keys]
+    if (
+        not kept
+        or not (removed or added)
+        or not all(map(_is_assignment, (*removed, *added)))
+    ):
+        return None
+    removed_names = frozenset(
+        target.id
+        for statement in removed
+        for target in ast.walk(statement)
+        if isinstance(target, ast.Name) and isinstance(target.ctx, ast.Store)
+    )
+    if any(
+        isinstance(node, ast.Name) and node.id in removed_names
+        for statement in kept
+        for node in ast.walk(statement)
+    ):
+        return None
+    removed_lines = frozenset(chain.from_iterable(map(_line_numbers, removed)))
+    if not removed_lines.isdisjoint(
+        chain.from_iterable(map(_line_numbers, kept))
+    ):
+        return None
+    edited = EMPTY.join(
+        line
+        for line_number, line in enumerate(code.splitlines(keepends=True), 1)
+        if line_number not in removed_lines
+    )
+    if added:
+        lines = contents.splitlines()
+        if edited and not edited.endswith(NEWLINE):
+            edited += NEWLINE
+        edited += NEWLINE.join(
+            NEWLINE.join(lines[statement.lineno - 1 : statement.end_lineno])
+            for statement in added
+        )
+        if code.endswith(NEWLINE):
+            edited += NEWLINE
+    return edited
+
+
+def _is_assignment(statement: ast.stmt) -> bool:
+    if isinstance(statement, ast.AnnAssign):
+        return isinstance(statement.target, ast.Name)
+    return (
+        isinstance(statement, ast.Assign)
+        and len(statement.targets) == 1
+        and isinstance(target := statement.targets[0], ast.Name)
+        and target.id != UNDERSCORE
+    )
+
+
+def _line_numbers(statement: ast.stmt) -> range:
+    return range(
+        statement.lineno, (statement.end_lineno or statement.lineno) + 1
+    )
 
 
 def _line(name: str, const: ConstBase) -> str: